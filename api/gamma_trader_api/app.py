@@ -1,18 +1,40 @@
 from __future__ import annotations
 
 import json
+import os
+import time
 from pathlib import Path
 from typing import Any
 
 import pandas as pd
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse
+
+from gamma_trader_api import exposition, formats
+
+try:  # the API can run without the pipeline package installed
+    from gamma_trader import metrics
+except ImportError:
+    metrics = None
 
 
 ROOT = Path(__file__).resolve().parents[2]
-DATA_DIR = ROOT / "data"
+DATA_DIR = Path(os.getenv("GT_DATA_DIR") or ROOT / "data")
 
 app = FastAPI(title="Gamma Trader API", version="0.1.0")
 
+if metrics is not None:
+    metrics.enable()
+
+    @app.middleware("http")
+    async def _time_requests(request: Request, call_next):
+        t0 = time.perf_counter()
+        response = await call_next(request)
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        metrics.observe(f"api{route}", time.perf_counter() - t0)
+        metrics.inc(f"api.status_{response.status_code}")
+        return response
+
 
 def _read_json(path: Path) -> Any:
     if not path.exists():
@@ -22,7 +44,7 @@ def _read_json(path: Path) -> Any:
 
 @app.get("/health")
 def health():
-    return {"ok": True}
+    return {"ok": True, "data_dir": str(DATA_DIR.resolve())}
 
 
 @app.get("/plan/latest")
@@ -30,25 +52,92 @@ def plan_latest():
     return _read_json(DATA_DIR / "latest_plan.json")
 
 
-@app.get("/series/today")
-def series_today(limit: int = 400):
-    p = DATA_DIR / "timeseries.parquet"
-    if not p.exists():
-        raise HTTPException(status_code=404, detail="missing: timeseries.parquet")
+SERIES_COLS = ["ts", "spot", "call_wall", "put_wall", "magnet", "flip", "p_up"]
+# dataset.parquet has no model output; p_up is only in the watcher/export series
+RANGE_COLS = ["ts", "date", "spot", "call_wall", "put_wall", "magnet", "flip", "pressure"]
 
-    df = pd.read_parquet(p)
-    if df.empty:
-        return []
+_frames: dict[Path, tuple[int, pd.DataFrame]] = {}
 
-    day = df["date"].max()
-    g = df[df["date"] == day].sort_values("ts")
 
-    if limit and len(g) > limit:
-        g = g.iloc[-limit:]
+def _read_frame(path: Path) -> pd.DataFrame:
+    """Parquet file sorted by ts, cached until its mtime changes."""
+    if not path.exists():
+        raise HTTPException(status_code=404, detail=f"missing: {path.name}")
+    mtime = path.stat().st_mtime_ns
+    hit = _frames.get(path)
+    if hit is not None and hit[0] == mtime:
+        return hit[1]
+    df = pd.read_parquet(path)
+    if "ts" in df.columns:
+        df = df.sort_values("ts", kind="stable").reset_index(drop=True)
+    _frames[path] = (mtime, df)
+    return df
+
+
+def _series_response(request: Request, df: pd.DataFrame, fmt: str) -> Response:
+    """Encode df as ?format= (or per the Accept header) and compress per Accept-Encoding."""
+    if fmt:
+        if fmt not in formats.ENCODERS:
+            raise HTTPException(status_code=400, detail=f"unknown format: {fmt}")
+        if fmt == formats.ARROW and not formats.arrow_available():
+            raise HTTPException(status_code=406, detail="arrow format needs pyarrow")
+    else:
+        fmt = formats.negotiate(request.headers.get("accept"), arrow=formats.arrow_available())
+
+    body = formats.ENCODERS[fmt](df)
+    body, encoding = formats.compress(body, request.headers.get("accept-encoding"))
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=formats.MEDIA_TYPES[fmt], headers=headers)
 
-    cols = [c for c in ["ts", "spot", "call_wall", "put_wall", "magnet", "flip", "p_up"] if c in g.columns]
-    out = g[cols].copy()
 
-    # JSON safe
-    out["ts"] = out["ts"].astype(str)
-    return out.to_dict(orient="records")
+@app.get("/series/today")
+def series_today(request: Request, limit: int = 400, fmt: str = Query("", alias="format")):
+    df = _read_frame(DATA_DIR / "timeseries.parquet")
+    if not df.empty:
+        df = df[df["date"] == df["date"].max()]
+        if limit and len(df) > limit:
+            df = df.iloc[-limit:]
+    cols = [c for c in SERIES_COLS if c in df.columns]
+    return _series_response(request, df[cols], fmt)
+
+
+@app.get("/series")
+def series_range(
+    request: Request,
+    start: str = "",
+    end: str = "",
+    days: int = 0,
+    fmt: str = Query("", alias="format"),
+):
+    """Levels of every snapshot in dataset.parquet between start and end (yyyy-mm-dd,
+    inclusive), or of the newest `days` dates. No p_up: the dataset is not scored."""
+    df = _read_frame(DATA_DIR / "dataset.parquet")
+    if start:
+        df = df[df["date"] >= start]
+    if end:
+        df = df[df["date"] <= end]
+    if days > 0 and not df.empty:
+        keep = sorted(df["date"].unique())[-days:]
+        df = df[df["date"] >= keep[0]]
+    cols = [c for c in RANGE_COLS if c in df.columns]
+    return _series_response(request, df[cols], fmt)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """Prometheus text format: this process plus any *.prom files the watcher writes to data/.
+
+    Families exported by several files are merged, each file's samples labelled with
+    source="<file stem>".
+    """
+    parts = []
+    if metrics is not None:
+        parts.append((None, metrics.render_prometheus(prefix="gt_api")))
+    for p in sorted(DATA_DIR.glob("*.prom")):
+        try:
+            parts.append((p.stem, p.read_text(encoding="utf-8")))
+        except OSError:
+            continue
+    return PlainTextResponse(exposition.merge(parts), media_type="text/plain; version=0.0.4")
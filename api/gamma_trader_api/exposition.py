@@ -0,0 +1,75 @@
+"""Merge several Prometheus text documents into one scrape body.
+
+Joining the files as raw text repeats `# HELP`/`# TYPE` for a family that more than one
+process exports, and Prometheus then rejects the whole scrape.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+
+def _esc(s: str) -> str:
+    return s.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _family(sample: str, fam: str | None) -> str:
+    """Family of a sample line: the current HELP/TYPE family for its _bucket/_sum/...
+    lines, else the sample's own name."""
+    name = sample.split("{", 1)[0].split(" ", 1)[0]
+    if fam is not None and (name == fam or name.startswith(fam + "_")):
+        return fam
+    return name
+
+
+def _with_label(sample: str, label: str) -> str:
+    name, brace, rest = sample.partition("{")
+    if brace:
+        return f"{name}{{{label}{'' if rest.startswith('}') else ','}{rest}"
+    name, _, rest = sample.partition(" ")
+    return f"{name}{{{label}}} {rest}"
+
+
+def merge(parts: Iterable[tuple[str | None, str]]) -> str:
+    """One exposition from (source, text) parts.
+
+    Each family gets a single HELP/TYPE (the first seen) followed by the samples of every
+    part. Samples of a part with a source get `source="<source>"`, so the same series from
+    two exporters stays distinct. A part that declares another TYPE for a family already
+    seen is left out of that family.
+    """
+    helps: dict[str, str] = {}
+    types: dict[str, str] = {}
+    samples: dict[str, list[str]] = {}
+    for source, text in parts:
+        label = f'source="{_esc(source)}"' if source else None
+        fam = None
+        part_types: dict[str, str] = {}
+        for raw in text.splitlines():
+            line = raw.strip()
+            if not line:
+                continue
+            if line.startswith("#"):
+                bits = line.split(None, 3)
+                if len(bits) >= 3 and bits[1] in ("HELP", "TYPE"):
+                    fam = bits[2]
+                    samples.setdefault(fam, [])
+                    if bits[1] == "HELP":
+                        helps.setdefault(fam, line)
+                    else:
+                        part_types[fam] = bits[3] if len(bits) > 3 else "untyped"
+                        types.setdefault(fam, part_types[fam])
+                continue
+            f = _family(line, fam)
+            if f in part_types and part_types[f] != types[f]:
+                continue
+            samples.setdefault(f, []).append(_with_label(line, label) if label else line)
+
+    lines = []
+    for fam, rows in samples.items():
+        if fam in helps:
+            lines.append(helps[fam])
+        if fam in types:
+            lines.append(f"# TYPE {fam} {types[fam]}")
+        lines.extend(rows)
+    return "\n".join(lines) + "\n" if lines else ""
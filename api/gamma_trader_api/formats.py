@@ -0,0 +1,150 @@
+"""Series response encodings: records / columnar JSON / Arrow IPC, plus gzip/brotli.
+
+- records (`application/json`, the default): one object per row, `ts` as a string. This is
+  what `web/index.html` reads.
+- columnar (`application/vnd.gamma-trader.columnar+json`): `{"length": n, "columns":
+  {field: [...]}}` with one array per field, `ts` in epoch milliseconds (the naive
+  snapshot time read as UTC, so the HH:MM is unchanged) and NaN/NaT as null. Floats keep
+  15 decimal places.
+- arrow (`application/vnd.apache.arrow.stream`): an Arrow IPC stream of the same frame,
+  `ts` as timestamp[ms]. Needs pyarrow.
+
+Bodies of at least MIN_COMPRESS_BYTES are brotli- or gzip-encoded when the client accepts
+it. brotli is only used when the `brotli` module is installed.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+
+import pandas as pd
+
+RECORDS = "records"
+COLUMNAR = "columnar"
+ARROW = "arrow"
+
+MEDIA_TYPES = {
+    RECORDS: "application/json",
+    COLUMNAR: "application/vnd.gamma-trader.columnar+json",
+    ARROW: "application/vnd.apache.arrow.stream",
+}
+
+MIN_COMPRESS_BYTES = 1024
+# Below SMALL_BODY_BYTES (a day or so of series) gzip -6 costs ~1 ms and is ~10% smaller
+# than -1; above it -1 is 3-5x faster for a few % larger bodies.
+SMALL_BODY_BYTES = 256 * 1024
+GZIP_LEVEL_SMALL = 6
+GZIP_LEVEL = 1
+BROTLI_QUALITY = 4
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def arrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _accept_list(header: str) -> list[tuple[str, float]]:
+    """(value, q) of an Accept / Accept-Encoding header, in header order."""
+    out = []
+    for part in header.split(","):
+        value, *params = [x.strip() for x in part.split(";")]
+        if not value:
+            continue
+        q = 1.0
+        for p in params:
+            k, _, v = p.partition("=")
+            if k.strip().lower() == "q":
+                try:
+                    q = float(v)
+                except ValueError:
+                    q = 0.0
+        out.append((value.lower(), q))
+    return out
+
+
+def negotiate(accept: str | None, *, arrow: bool = True) -> str:
+    """Format for an Accept header: the supported type with the highest q (first on ties).
+
+    Anything else, including */* and a missing header, is records.
+    """
+    by_type = {m: f for f, m in MEDIA_TYPES.items() if arrow or f != ARROW}
+    best, best_q = RECORDS, 0.0
+    for value, q in _accept_list(accept or ""):
+        fmt = by_type.get(value)
+        if fmt is not None and q > best_q:
+            best, best_q = fmt, q
+    return best
+
+
+def encode_records(df: pd.DataFrame) -> bytes:
+    out = df.copy()
+    if "ts" in out.columns:
+        out["ts"] = out["ts"].astype(str)
+    out = out.astype(object).where(out.notna(), None)
+    return json.dumps(out.to_dict(orient="records"), separators=(",", ":")).encode("utf-8")
+
+
+def _epoch_ms(s: pd.Series) -> str:
+    if not pd.api.types.is_datetime64_any_dtype(s):
+        s = pd.to_datetime(s)  # slow even for datetime input, so only when needed
+    ms = pd.Series(s.to_numpy().astype("datetime64[ms]").astype("int64"))
+    na = s.isna().to_numpy()
+    if na.any():
+        ms = ms.astype(object).where(~na, None)
+    return ms.to_json(orient="values")
+
+
+def encode_columnar(df: pd.DataFrame) -> bytes:
+    """One JSON array per column, each serialized by pandas' C encoder (NaN -> null)."""
+    parts = []
+    for c in df.columns:
+        s = df[c]
+        if pd.api.types.is_datetime64_any_dtype(s) or c == "ts":
+            arr = _epoch_ms(s)
+        else:
+            arr = s.to_json(orient="values", double_precision=15)
+        parts.append(f"{json.dumps(str(c))}:{arr}")
+    return f'{{"length":{len(df)},"columns":{{{",".join(parts)}}}}}'.encode()
+
+
+def encode_arrow(df: pd.DataFrame) -> bytes:
+    import pyarrow as pa
+
+    out = df.copy()
+    for c in out.columns:
+        if pd.api.types.is_datetime64_any_dtype(out[c]):
+            out[c] = out[c].astype("datetime64[ms]")
+    table = pa.Table.from_pandas(out, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as w:
+        w.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+ENCODERS = {RECORDS: encode_records, COLUMNAR: encode_columnar, ARROW: encode_arrow}
+
+
+def compress(body: bytes, accept_encoding: str | None) -> tuple[bytes, str | None]:
+    """(body, Content-Encoding) using br or gzip, whichever the client ranks higher."""
+    if len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    offered = {"gzip"} | ({"br"} if brotli is not None else set())
+    best, best_q = None, 0.0
+    for value, q in _accept_list(accept_encoding or ""):
+        if value in offered and (q > best_q or (q == best_q and value == "br")):
+            best, best_q = value, q
+    if best == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY), "br"
+    if best == "gzip":
+        level = GZIP_LEVEL_SMALL if len(body) < SMALL_BODY_BYTES else GZIP_LEVEL
+        return gzip.compress(body, compresslevel=level, mtime=0), "gzip"
+    return body, None
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from gamma_trader_api.exposition import merge
+
+WATCH = """# HELP gt_stage_seconds Wall time per pipeline stage.
+# TYPE gt_stage_seconds histogram
+gt_stage_seconds_bucket{stage="ingest.parse",le="+Inf"} 3
+gt_stage_seconds_sum{stage="ingest.parse"} 0.25
+gt_stage_seconds_count{stage="ingest.parse"} 3
+# HELP gt_events_total Pipeline event counts.
+# TYPE gt_events_total counter
+gt_events_total{event="watch.processed"} 3
+"""
+
+OTHER = """# HELP gt_stage_seconds Another help text.
+# TYPE gt_stage_seconds histogram
+gt_stage_seconds_bucket{stage="ingest.parse",le="+Inf"} 1
+gt_stage_seconds_sum{stage="ingest.parse"} 0.5
+gt_stage_seconds_count{stage="ingest.parse"} 1
+# TYPE gt_events_total gauge
+gt_events_total{event="watch.processed"} 9
+up 1
+"""
+
+
+def test_one_help_and_type_per_family():
+    out = merge([("metrics_watch", WATCH), ("metrics_other", OTHER)])
+    lines = out.splitlines()
+    assert sum(x.startswith("# HELP gt_stage_seconds ") for x in lines) == 1
+    assert sum(x.startswith("# TYPE gt_stage_seconds ") for x in lines) == 1
+    assert "# HELP gt_stage_seconds Wall time per pipeline stage." in lines
+    # family blocks stay contiguous: HELP, TYPE, then all samples of both files
+    i = lines.index("# TYPE gt_stage_seconds histogram")
+    assert all(x.startswith("gt_stage_seconds_") for x in lines[i + 1 : i + 7])
+
+
+def test_samples_get_a_source_label():
+    lines = merge([("metrics_watch", WATCH), ("metrics_other", OTHER)]).splitlines()
+    assert 'gt_stage_seconds_count{source="metrics_watch",stage="ingest.parse"} 3' in lines
+    assert 'gt_stage_seconds_count{source="metrics_other",stage="ingest.parse"} 1' in lines
+    assert 'up{source="metrics_other"} 1' in lines
+    assert len(lines) == len(set(lines))
+
+
+def test_conflicting_type_is_dropped_and_unlabelled_part_unchanged():
+    lines = merge([(None, WATCH), ("metrics_other", OTHER)]).splitlines()
+    assert 'gt_events_total{event="watch.processed"} 3' in lines
+    assert not any("} 9" in x for x in lines)
+    assert "# TYPE gt_events_total counter" in lines
+
+
+def test_empty():
+    assert merge([]) == ""
+    assert merge([("a", "")]) == ""
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import gzip
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gamma_trader_api import formats
+
+ENCODINGS = {"identity": None, "gzip": "gzip", "br": "br"}
+
+
+def _frame(n: int = 400) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    p_up = rng.uniform(0, 1, n)
+    p_up[::7] = np.nan
+    return pd.DataFrame(
+        {
+            "ts": pd.date_range("2024-01-02 08:30", periods=n, freq="min"),
+            "spot": np.round(4750 + rng.normal(0, 1, n).cumsum(), 2),
+            "call_wall": 4800.0,
+            "p_up": p_up,
+        }
+    )
+
+
+def _decompress(body: bytes, encoding: str | None) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "br":
+        return formats.brotli.decompress(body)
+    return body
+
+
+def _decode(fmt: str, body: bytes) -> pd.DataFrame:
+    if fmt == formats.RECORDS:
+        df = pd.DataFrame(json.loads(body))
+        df["ts"] = pd.to_datetime(df["ts"])
+    elif fmt == formats.COLUMNAR:
+        js = json.loads(body)
+        df = pd.DataFrame(js["columns"])
+        assert len(df) == js["length"]
+        df["ts"] = pd.to_datetime(df["ts"], unit="ms")
+    else:
+        import pyarrow as pa
+
+        df = pa.ipc.open_stream(io.BytesIO(body)).read_pandas()
+    df["ts"] = df["ts"].astype("datetime64[ns]")
+    return df.astype({c: float for c in df.columns if c not in ("ts", "date")})
+
+
+@pytest.mark.parametrize("encoding", sorted(ENCODINGS))
+@pytest.mark.parametrize("fmt", [formats.RECORDS, formats.COLUMNAR, formats.ARROW])
+def test_round_trip(fmt, encoding):
+    if fmt == formats.ARROW:
+        pytest.importorskip("pyarrow")
+    if encoding == "br":
+        pytest.importorskip("brotli")
+    df = _frame()
+    body, used = formats.compress(formats.ENCODERS[fmt](df), encoding)
+    assert used == ENCODINGS[encoding]
+    out = _decode(fmt, _decompress(body, used))
+    expected = df.assign(ts=df["ts"].astype("datetime64[ns]"))
+    pd.testing.assert_frame_equal(out, expected, check_exact=False, rtol=1e-12)
+
+
+def test_columnar_nulls():
+    df = pd.DataFrame({"ts": pd.to_datetime(["2024-01-02 08:30", None]), "x": [1.5, np.nan]})
+    js = json.loads(formats.encode_columnar(df))
+    assert js == {"length": 2, "columns": {"ts": [1704184200000, None], "x": [1.5, None]}}
+
+
+def test_compress_threshold_and_level():
+    small = b"x" * (formats.MIN_COMPRESS_BYTES - 1)
+    assert formats.compress(small, "gzip") == (small, None)
+    # gzip header byte 8 (XFL) is 4 for level 1 and 0 for levels 2-8
+    body, _ = formats.compress(b"x" * formats.MIN_COMPRESS_BYTES, "gzip")
+    assert body[8] == 0
+    body, _ = formats.compress(b"x" * formats.SMALL_BODY_BYTES, "gzip")
+    assert body[8] == 4
+
+
+def test_accept_encoding():
+    body = b"x" * formats.MIN_COMPRESS_BYTES
+    assert formats.compress(body, "gzip;q=0, identity")[1] is None
+    assert formats.compress(body, "deflate")[1] is None
+    assert formats.compress(body, "")[1] is None
+    br = "br" if formats.brotli is not None else "gzip"
+    assert formats.compress(body, "gzip, br")[1] == br
+    assert formats.compress(body, "gzip;q=1, br;q=0.5")[1] == "gzip"
+
+
+def test_negotiate():
+    col, arrow = formats.MEDIA_TYPES[formats.COLUMNAR], formats.MEDIA_TYPES[formats.ARROW]
+    assert formats.negotiate(None) == formats.RECORDS
+    assert formats.negotiate("*/*") == formats.RECORDS
+    assert formats.negotiate(f"{col}, {arrow}") == formats.COLUMNAR
+    assert formats.negotiate(f"{col};q=0.5, {arrow}") == formats.ARROW
+    assert formats.negotiate(f"{col};q=0.5, {arrow}", arrow=False) == formats.COLUMNAR
+    assert formats.negotiate(f"{col};q=0") == formats.RECORDS
+
+
+def test_series_endpoint(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")  # parquet engine
+    from fastapi.testclient import TestClient
+
+    from gamma_trader_api import app as app_mod
+
+    df = _frame().assign(date="2024-01-02")
+    df.to_parquet(tmp_path / "dataset.parquet")
+    monkeypatch.setattr(app_mod, "DATA_DIR", tmp_path)
+    client = TestClient(app_mod.app)
+
+    r = client.get("/series?format=columnar", headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["content-type"] == formats.MEDIA_TYPES[formats.COLUMNAR]
+    assert r.json()["length"] == len(df)
+    assert "p_up" not in r.json()["columns"]  # the dataset is not scored
+
+    r = client.get("/series", headers={"Accept": formats.MEDIA_TYPES[formats.ARROW]})
+    assert r.headers["content-type"] == formats.MEDIA_TYPES[formats.ARROW]
+    assert len(_decode(formats.ARROW, r.content)) == len(df)
+
+    assert client.get("/series?format=xml").status_code == 400
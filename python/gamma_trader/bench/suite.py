@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import warnings
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from gamma_trader.bench.synthetic import synthetic_chain, write_snapshot_dir
+
+
+def _time(fn: Callable[[], Any], *, repeat: int, number: int = 1, warmup: int = 1) -> dict:
+    """Run fn `number` times per sample for `repeat` samples; report per-call seconds.
+
+    A failing benchmark is recorded with its error instead of aborting the suite.
+    """
+    samples = []
+    try:
+        for _ in range(warmup):
+            fn()
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            for _ in range(number):
+                fn()
+            samples.append((time.perf_counter() - t0) / number)
+    except Exception as e:  # noqa: BLE001 - any failure becomes the benchmark's result
+        return {"repeat": repeat, "number": number, "error": f"{type(e).__name__}: {e}"}
+    return {
+        "repeat": repeat,
+        "number": number,
+        "min_s": min(samples),
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.fmean(samples),
+    }
+
+
+def _git_commit(cwd: Path) -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=cwd, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _bench_api(work: Path, series: Any, plan: dict, *, repeat: int) -> dict[str, dict]:
+    try:
+        import gamma_trader_api.app as api
+        from fastapi.testclient import TestClient
+    except ImportError as e:
+        print(f"skip api benchmarks: {type(e).__name__}: {e}")
+        return {}
+
+    data_dir = work / "api_data"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    (data_dir / "latest_plan.json").write_text(json.dumps(plan, indent=2), encoding="utf-8")
+    series.to_parquet(data_dir / "timeseries.parquet", index=False)
+
+    prev = api.DATA_DIR
+    api.DATA_DIR = data_dir
+    try:
+        client = TestClient(api.app, raise_server_exceptions=False)
+        out = {}
+        for path in ["/health", "/plan/latest", "/series/today"]:
+            def call(path=path):
+                r = client.get(path)
+                r.raise_for_status()
+
+            out[f"api{path.replace('/', '.')}"] = _time(call, repeat=repeat, number=10)
+        if hasattr(api, "formats"):
+            for fmt in ["columnar", "arrow"]:
+                def call(fmt=fmt):
+                    r = client.get(f"/series/today?format={fmt}", headers={"Accept-Encoding": "gzip"})
+                    r.raise_for_status()
+
+                out[f"api.series.today.{fmt}"] = _time(call, repeat=repeat, number=10)
+        return out
+    finally:
+        api.DATA_DIR = prev
+
+
+def run_suite(
+    *,
+    contracts: int = 2000,
+    strike_spacing: float = 5.0,
+    nan_density: float = 0.0,
+    days: int = 5,
+    snapshots_per_day: int = 27,
+    repeat: int = 5,
+    seed: int = 0,
+    work_dir: Path | None = None,
+) -> dict:
+    """Time the hot paths on synthetic data and return a JSON-serialisable result."""
+
+    from gamma_trader.features.levels import compute_levels_from_columnar_json
+    from gamma_trader.ingest.snapshot import load_snapshot_json
+    from gamma_trader.labels.targets import add_direction_label
+    from gamma_trader.scripts.build_dataset import build_dataset
+    from gamma_trader.scripts.train import fit_model
+
+    params = {
+        "contracts": contracts,
+        "strike_spacing": strike_spacing,
+        "nan_density": nan_density,
+        "days": days,
+        "snapshots_per_day": snapshots_per_day,
+        "repeat": repeat,
+        "seed": seed,
+    }
+    chain_kw = {"contracts": contracts, "strike_spacing": strike_spacing, "nan_density": nan_density}
+    cfg = {"symbol": "SPX", "interval_minutes": 15, "band_pct": 0.05, "contract_multiplier": 100}
+
+    results: dict[str, dict] = {}
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp, warnings.catch_warnings():
+        # NaN-heavy chains make numpy/sklearn chatty; timings are what matter here
+        warnings.simplefilter("ignore")
+        work = Path(tmp)
+
+        one = work / "one" / "SPX-4750.00-2024-01-02-20240102-093000.json"
+        one.parent.mkdir()
+        js = synthetic_chain(seed=seed, **chain_kw)
+        one.write_text(json.dumps(js), encoding="utf-8")
+
+        results["ingest.load_snapshot_json"] = _time(lambda: load_snapshot_json(one), repeat=repeat, number=5)
+        results["features.compute_levels"] = _time(
+            lambda: compute_levels_from_columnar_json(js, band_pct=0.05, contract_multiplier=100),
+            repeat=repeat,
+            number=5,
+        )
+
+        snaps = work / "snapshots"
+        write_snapshot_dir(snaps, days=days, snapshots_per_day=snapshots_per_day, seed=seed, **chain_kw)
+
+        holder: dict[str, Any] = {}
+
+        def build():
+            holder["df"] = build_dataset(cfg, snaps)
+
+        results["build_dataset.full"] = _time(build, repeat=max(1, repeat // 2), warmup=0)
+        df = holder["df"]
+
+        day = df[df["date"] == df["date"].max()]
+        results["labels.add_direction_label"] = _time(
+            lambda: add_direction_label(day, horizon_bars=1, price_col="spot"), repeat=repeat, number=20
+        )
+
+        # no hold-out: time the fit itself
+        train_cfg = {"training": {"test_days": 0}}
+
+        def fit():
+            holder["model"] = fit_model(df, train_cfg)[0]
+
+        results["train.fit"] = _time(fit, repeat=repeat)
+        model = holder["model"]
+
+        from gamma_trader.scripts.train import FEATURES
+
+        results["inference.predict_proba.dataset"] = _time(
+            lambda: model.predict_proba(df[FEATURES]), repeat=repeat, number=5
+        )
+        results["inference.predict_proba.day"] = _time(
+            lambda: model.predict_proba(day[FEATURES]), repeat=repeat, number=20
+        )
+
+        series = day.copy()
+        series["p_up"] = model.predict_proba(day[FEATURES])[:, 1]
+        last = series.iloc[-1]
+        plan = {
+            "symbol": "SPX",
+            "date": str(last["date"]),
+            "target": "next 15m direction",
+            "latest": {"ts": str(last["ts"]), "spot": float(last["spot"]), "p_up": float(last["p_up"])},
+        }
+        results.update(_bench_api(work, series, plan, repeat=repeat))
+
+    return {
+        "meta": {
+            "commit": _git_commit(Path(__file__).resolve().parent),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": params,
+        },
+        "results": results,
+    }
+
+
+def compare(base: dict, new: dict, *, threshold: float = 0.10, stat: str = "median_s") -> list[dict]:
+    """Compare two run_suite results.
+
+    A benchmark regresses if new > base * (1 + threshold), or if it worked in base
+    and errors in new or is missing from it (renamed or skipped).
+    """
+    rows = []
+    for name in sorted(set(base["results"]) | set(new["results"])):
+        b = base["results"].get(name, {}).get(stat)
+        n = new["results"].get(name, {}).get(stat)
+        missing = name not in new["results"]
+        err = "missing from new run" if missing else new["results"][name].get("error")
+        ratio = (n / b) if (b and n is not None) else None
+        rows.append(
+            {
+                "name": name,
+                "base_s": b,
+                "new_s": n,
+                "ratio": ratio,
+                "error": err,
+                "missing": missing,
+                "regression": (ratio is not None and ratio > 1.0 + threshold) or (b is not None and err is not None),
+            }
+        )
+    return rows
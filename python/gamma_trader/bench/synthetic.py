@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+# every spelling _normalize_side understands, in mixed case/padding like real feeds
+CALL_SPELLINGS = ["call", "c", "calls", "Call", "C", " CALL "]
+PUT_SPELLINGS = ["put", "p", "puts", "Put", "P", " PUT "]
+
+
+def synthetic_chain(
+    *,
+    spot: float = 4750.0,
+    contracts: int = 2000,
+    strike_spacing: float = 5.0,
+    nan_density: float = 0.0,
+    symbol: str = "SPX",
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Build one columnar snapshot (the same layout the PS1 writes).
+
+    Strikes are centred on spot with one call and one put per strike. Gamma peaks
+    at the money, IV has a mild put skew, and open interest clusters on round strikes.
+    `nan_density` is the fraction of numeric cells replaced by NaN (serialised as null).
+    """
+    rng = np.random.default_rng(seed)
+    n_strikes = max(1, contracts // 2)
+    center = round(spot / strike_spacing) * strike_spacing
+    strikes = center + (np.arange(n_strikes) - n_strikes // 2) * strike_spacing
+    strike = np.repeat(strikes, 2)
+    is_call = np.tile([True, False], n_strikes)
+    n = len(strike)
+
+    m = (strike - spot) / spot
+    gamma = 0.02 * np.exp(-((m / 0.015) ** 2)) + rng.uniform(0.0, 1e-4, n)
+    iv = 0.12 + 0.8 * m**2 - np.where(is_call, 0.0, 0.3 * np.minimum(m, 0.0)) + rng.normal(0.0, 0.003, n)
+    vega = np.maximum(0.0, 2.5 * np.exp(-((m / 0.03) ** 2)) + rng.normal(0.0, 0.05, n))
+    round_boost = np.where(np.mod(strike, 25.0) == 0.0, 4.0, 1.0)
+    oi = np.floor(rng.gamma(2.0, 400.0, n) * round_boost * np.exp(-np.abs(m) / 0.05))
+    volume = np.floor(rng.gamma(1.5, 150.0, n) * np.exp(-np.abs(m) / 0.02))
+
+    cols = {"openInterest": oi, "volume": volume, "gamma": gamma, "iv": iv, "vega": vega}
+    if nan_density > 0:
+        for k, v in cols.items():
+            v = v.astype(float)
+            v[rng.random(n) < nan_density] = np.nan
+            cols[k] = v
+
+    sides = np.where(
+        is_call,
+        np.array(CALL_SPELLINGS)[rng.integers(0, len(CALL_SPELLINGS), n)],
+        np.array(PUT_SPELLINGS)[rng.integers(0, len(PUT_SPELLINGS), n)],
+    )
+
+    def _col(v: np.ndarray) -> list:
+        return [None if not np.isfinite(x) else float(x) for x in v]
+
+    return {
+        "s": "ok",
+        "optionSymbol": [f"{symbol}{int(k * 1000):08d}{'C' if c else 'P'}" for k, c in zip(strike, is_call)],
+        "underlying": [symbol] * n,
+        "strike": [float(x) for x in strike],
+        "side": sides.tolist(),
+        "underlyingPrice": [float(spot)] * n,
+        **{k: _col(v) for k, v in cols.items()},
+    }
+
+
+def write_snapshot_dir(
+    out_dir: Path,
+    *,
+    days: int = 5,
+    snapshots_per_day: int = 27,
+    interval_minutes: int = 15,
+    start: date = date(2024, 1, 2),
+    symbol: str = "SPX",
+    spot: float = 4750.0,
+    seed: int = 0,
+    **chain_kwargs: Any,
+) -> list[Path]:
+    """Write `days` weekdays of snapshots named like the PS1 output into `out_dir`.
+
+    Spot follows a seeded random walk so labels are not constant; the expiration in
+    the filename is the observation date (0DTE).
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    paths: list[Path] = []
+
+    d = start
+    k = 0
+    while len(paths) < days * snapshots_per_day:
+        if d.weekday() < 5:
+            px = spot
+            for i in range(snapshots_per_day):
+                obs = datetime.combine(d, time(8, 30)) + timedelta(minutes=interval_minutes * i)
+                px = float(px * (1.0 + rng.normal(0.0, 0.001)))
+                js = synthetic_chain(spot=px, symbol=symbol, seed=seed * 100_003 + k, **chain_kwargs)
+                name = f"{symbol}-{px:.2f}-{d:%Y-%m-%d}-{obs:%Y%m%d}-{obs:%H%M%S}.json"
+                p = out_dir / name
+                p.write_text(json.dumps(js), encoding="utf-8")
+                paths.append(p)
+                k += 1
+            spot = px
+        d += timedelta(days=1)
+
+    return paths
@@ -0,0 +1,106 @@
+"""Client side of the gt-daemon protocol (stdlib only, so forwarding CLIs start fast).
+
+One request per TCP connection on localhost: a JSON line
+`{"cmd": ..., "token": ..., "args": {...}}` answered by a JSON line
+`{"ok": true, "output": "...", "result": {...}}` or `{"ok": false, "error": "..."}`
+(with `"refused": true` when the daemon will not serve it). The server lives in
+gamma_trader.scripts.daemon.
+
+The token is a random secret that `gt-daemon serve` writes to a file only its user can
+read (GT_DAEMON_TOKEN_FILE, default ~/.gamma_trader/daemon-<port>.token), so other local
+users cannot drive the daemon.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import secrets
+import socket
+import sys
+from pathlib import Path
+from typing import Any
+
+DEFAULT_ADDR = "127.0.0.1:8765"
+
+
+class DaemonUnavailable(RuntimeError):
+    pass
+
+
+class DaemonRefused(DaemonUnavailable):
+    """The daemon is up but will not serve this request (token, paths or out dir)."""
+
+
+def daemon_address(addr: str = "") -> tuple[str, int]:
+    """host:port from the argument, GT_DAEMON_ADDR, or the default."""
+    s = addr or os.getenv("GT_DAEMON_ADDR", "") or DEFAULT_ADDR
+    host, _, port = s.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def token_path(addr: str = "") -> Path:
+    env = os.getenv("GT_DAEMON_TOKEN_FILE", "")
+    if env:
+        return Path(env).expanduser()
+    return Path.home() / ".gamma_trader" / f"daemon-{daemon_address(addr)[1]}.token"
+
+
+def write_token(path: Path) -> str:
+    """New random token in a file readable by the current user only."""
+    path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+    token = secrets.token_hex(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+    os.chmod(path, 0o600)  # the file may have existed with wider permissions
+    return token
+
+
+def request(
+    cmd: str, *, addr: str = "", timeout: float = 30.0, connect_timeout: float = 2.0, **args: Any
+) -> dict[str, Any]:
+    """Send one request; timeout bounds the wait for the answer, so a busy or stuck daemon
+    costs a caller with a local fallback at most connect_timeout + timeout."""
+    host, port = daemon_address(addr)
+    tpath = token_path(addr)
+    try:
+        token = tpath.read_text(encoding="utf-8").strip()
+    except OSError as e:
+        raise DaemonUnavailable(f"no gt-daemon token at {tpath} ({e})") from e
+
+    try:
+        with socket.create_connection((host, port), timeout=connect_timeout) as sock:
+            sock.settimeout(timeout)
+            with sock.makefile("rwb") as f:
+                f.write(json.dumps({"cmd": cmd, "token": token, "args": args}).encode("utf-8") + b"\n")
+                f.flush()
+                line = f.readline()
+    except OSError as e:  # includes timeouts while waiting for the answer
+        raise DaemonUnavailable(f"gt-daemon not reachable at {host}:{port} ({e})") from e
+    if not line:
+        raise DaemonUnavailable("gt-daemon closed the connection")
+
+    try:
+        resp = json.loads(line)
+    except ValueError as e:
+        raise DaemonUnavailable(f"bad answer from gt-daemon ({e})") from e
+    if not resp.get("ok"):
+        if resp.get("refused"):
+            raise DaemonRefused(f"gt-daemon refused {cmd}: {resp.get('error')}")
+        raise RuntimeError(resp.get("error", "daemon error"))
+    return resp
+
+
+def forward(cmd: str, *, addr: str = "", **args: Any) -> bool:
+    """Run cmd on the daemon and print its output. False if no daemon is running."""
+    try:
+        resp = request(cmd, addr=addr, **args)
+    except DaemonUnavailable as e:
+        print(f"{e}; running locally", file=sys.stderr)
+        return False
+    except RuntimeError as e:
+        raise SystemExit(str(e))
+    if resp.get("output"):
+        print(resp["output"])
+    return True
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from datetime import date, datetime, time
 from math import sqrt
 from typing import Any
+from zoneinfo import ZoneInfo
 
 import numpy as np
 
@@ -28,12 +30,47 @@ class LevelFeatures:
     iv_lower: float | None
     iv_move: float | None
 
+    atm_iv_call: float | None = None
+    atm_iv_put: float | None = None
+    atm_iv_strike: float | None = None
+    iv_t_years: float = 0.0
+
+    # option mid on the OTM side of each key level (PS1 Get-DirectionalMidAtStrike)
+    call_wall_mid: float | None = None
+    put_wall_mid: float | None = None
+    magnet_mid: float | None = None
+    flip_mid: float | None = None
+
 
 def _to_arr(d: dict[str, Any], key: str):
     v = d.get(key)
     return None if v is None else np.asarray(v)
 
 
+def _to_num(x: Any) -> float:
+    if x is None or (isinstance(x, str) and not x.strip()):
+        return np.nan
+    try:
+        return float(x)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _num_arr(d: dict[str, Any], key: str, n: int) -> np.ndarray:
+    """Column as float[n]; null/unparseable -> NaN, short columns padded (PS1 To-Num)."""
+    v = d.get(key)
+    if v is None:
+        return np.full(n, np.nan)
+    v = v if isinstance(v, list) else [v]
+    try:
+        a = np.asarray(v, dtype=float)
+    except (TypeError, ValueError):
+        a = np.array([_to_num(x) for x in v], dtype=float)
+    if len(a) >= n:
+        return a[:n]
+    return np.concatenate([a, np.full(n - len(a), np.nan)])
+
+
 def _normalize_side(x: Any) -> str | None:
     if x is None:
         return None
@@ -45,33 +82,130 @@ def _normalize_side(x: Any) -> str | None:
     return s
 
 
-def compute_levels_from_columnar_json(
-    js: dict[str, Any],
-    *,
-    band_pct: float = 0.05,
-    contract_multiplier: int = 100,
-) -> LevelFeatures:
-    # Required
+def _side_arr(d: dict[str, Any], n: int) -> np.ndarray:
+    v = d.get("side")
+    v = [] if v is None else v if isinstance(v, list) else [v]
+    out = np.full(n, None, dtype=object)
+    out[: min(n, len(v))] = [_normalize_side(x) for x in v[:n]]
+    return out
+
+
+def _seq_sum(x: np.ndarray) -> float:
+    # left-to-right like the PS1 `+=` loops (np.sum is pairwise and can differ in the last ulp)
+    return float(np.cumsum(x)[-1]) if len(x) else 0.0
+
+
+def _seq_mean(x: np.ndarray) -> float:
+    return _seq_sum(x) / len(x)
+
+
+def normalize_iv(iv: float) -> float | None:
+    """Percent -> decimal, drop tiny values, cap at 500% (PS1 Normalize-IV)."""
+    if not iv > 0:
+        return None
+    if iv > 5.0:
+        iv = iv / 100.0
+    if iv < 0.0001:
+        return None
+    return min(iv, 5.0)
+
+
+def compute_iv_band(
+    spot: float, atm_iv: float | None, observed: datetime, expiration: date
+) -> tuple[float | None, float | None, float | None, float]:
+    """(upper, lower, move, t_years): spot ± spot·iv·√t up to 16:00 on the expiration date.
+
+    observed must be naive US/Eastern wall time, like the expiration close.
+    """
+    if not spot > 0 or atm_iv is None or not atm_iv > 0:
+        return None, None, None, 0.0
+    secs = max(0.0, (datetime.combine(expiration, time(16, 0)) - observed).total_seconds())
+    t_years = secs / (365.0 * 24.0 * 3600.0)
+    move = spot * atm_iv * sqrt(max(0.0, t_years))
+    return spot + move, spot - move, move, t_years
+
+
+def _option_mids(js: dict[str, Any], n: int) -> np.ndarray:
+    """mid/midPrice/mark if > 0, else (bid+ask)/2 when both are > 0."""
+    key = next((k for k in ("mid", "midPrice", "mark") if js.get(k) is not None), None)
+    mid = _num_arr(js, key, n) if key else np.full(n, np.nan)
+    bid = _num_arr(js, "bid", n)
+    ask = _num_arr(js, "ask", n)
+    ba = np.where((bid > 0) & (ask > 0), (bid + ask) / 2.0, np.nan)
+    return np.where(mid > 0, mid, ba)
+
+
+def _directional_mid(
+    strike: np.ndarray,
+    side: np.ndarray,
+    mid: np.ndarray,
+    level: float | None,
+    spot: float,
+    tol: float,
+) -> float | None:
+    """Mid of the OTM option at level; nearest same-side strike with a mid as fallback."""
+    if level is None or not spot > 0:
+        return None
+    valid = (side == ("call" if level >= spot else "put")) & (mid > 0)
+    dist = np.abs(strike - level)
+    hit = valid & (dist <= max(tol, 0.0))
+    if hit.any():
+        return _seq_mean(mid[hit])
+    valid &= np.isfinite(strike)
+    if not valid.any():
+        return None
+    idx = np.flatnonzero(valid)
+    return float(mid[idx[np.argmin(dist[idx])]])
+
+
+def to_eastern(observed: datetime, tz: str | None = None) -> datetime:
+    """Naive wall time in tz (default: the system zone) -> naive US/Eastern wall time."""
+    local = observed.replace(tzinfo=ZoneInfo(tz)) if tz else observed.astimezone()
+    return local.astimezone(ZoneInfo("America/New_York")).replace(tzinfo=None)
+
+
+def _chain_arrays(js: dict[str, Any]) -> dict[str, np.ndarray]:
+    """optionSymbol-aligned float columns (null -> NaN) and normalized sides.
+
+    Missing openInterest/volume/gamma/vega columns count as zeros.
+    """
     sym = _to_arr(js, "optionSymbol")
     if sym is None:
         raise ValueError("JSON missing optionSymbol")
-
-    strike = _to_arr(js, "strike")
-    side_raw = _to_arr(js, "side")
-    oi = _to_arr(js, "openInterest")
-    vol = _to_arr(js, "volume")
-    u = _to_arr(js, "underlyingPrice")
-    gamma = _to_arr(js, "gamma")
-    iv = _to_arr(js, "iv")
-    vega = _to_arr(js, "vega")
+    if js.get("strike") is None:
+        raise ValueError("JSON missing strike")
 
     n = len(sym)
-    if strike is None or len(strike) != n:
-        raise ValueError("JSON missing/unaligned strike")
+    c = {k: _num_arr(js, k, n) for k in ("strike", "iv")}
+    for k in ("openInterest", "volume", "gamma", "vega"):
+        c[k] = _num_arr(js, k, n) if js.get(k) is not None else np.zeros(n)
+    c["underlyingPrice"] = _num_arr(js, "underlyingPrice", max(n, 1))
+    c["side"] = _side_arr(js, n)
+    return c
+
 
-    side = np.array([_normalize_side(x) for x in (side_raw if side_raw is not None else [None] * n)])
+def _total(x: np.ndarray, sequential: bool) -> float:
+    return _seq_sum(np.nan_to_num(x)) if sequential else float(np.nansum(x))
 
-    spot = float(u[0]) if u is not None and len(u) else float("nan")
+
+def _gex_levels(
+    c: dict[str, np.ndarray],
+    *,
+    band_pct: float,
+    contract_multiplier: int,
+    spot: float | None = None,
+    skip_nulls: bool = False,
+    sequential: bool = False,
+) -> LevelFeatures:
+    """Band filter -> per-strike net GEX -> walls, magnet and flip, plus pressure and vega.
+
+    spot overrides underlyingPrice. skip_nulls zeroes the GEX of rows with a null input
+    instead of letting NaN through to their strike's total. sequential sums left to right
+    like the PS1 `+=` loops instead of with np.nansum. The ATM IV fields are left empty.
+    """
+    strike = c["strike"]
+    if spot is None or not spot > 0:
+        spot = float(c["underlyingPrice"][0])
     if not np.isfinite(spot) or spot <= 0:
         # fallback: approximate from median strike
         spot = float(np.nanmedian(strike))
@@ -81,40 +215,36 @@ def compute_levels_from_columnar_json(
 
     in_band = (strike >= lo) & (strike <= hi)
     strike_b = strike[in_band]
-    side_b = side[in_band]
+    side_b = c["side"][in_band]
 
-    oi_b = (oi[in_band] if oi is not None else np.zeros_like(strike_b, dtype=float)).astype(float)
-    vol_b = (vol[in_band] if vol is not None else np.zeros_like(strike_b, dtype=float)).astype(float)
-    gamma_b = (gamma[in_band] if gamma is not None else np.zeros_like(strike_b, dtype=float)).astype(float)
-    vega_b = (vega[in_band] if vega is not None else np.zeros_like(strike_b, dtype=float)).astype(float)
-    iv_b = (iv[in_band] if iv is not None else np.full_like(strike_b, np.nan, dtype=float)).astype(float)
+    oi_b = c["openInterest"][in_band]
+    vol_b = c["volume"][in_band]
+    gamma_b = c["gamma"][in_band]
+    vega_b = c["vega"][in_band]
 
     call_mask = side_b == "call"
     put_mask = side_b == "put"
 
-    call_vol = float(np.nansum(vol_b[call_mask]))
-    put_vol = float(np.nansum(vol_b[put_mask]))
+    call_vol = _total(vol_b[call_mask], sequential)
+    put_vol = _total(vol_b[put_mask], sequential)
     den = call_vol + put_vol
     pressure = float((call_vol - put_vol) / den) if den > 0 else None
 
     # Vega net/abs (sign puts negative like PS1)
     signed = np.where(put_mask, -1.0, 1.0)
     vega_contrib = vega_b * oi_b * float(contract_multiplier)
-    vega_net = float(np.nansum(vega_contrib * signed))
-    vega_abs = float(np.nansum(np.abs(vega_contrib)))
+    vega_net = _total(vega_contrib * signed, sequential)
+    vega_abs = _total(np.abs(vega_contrib), sequential)
 
     # By-strike NetGEX
     spot2 = spot * spot
-    sign_g = np.where(put_mask, -1.0, 1.0)
-    gex = gamma_b * oi_b * float(contract_multiplier) * spot2 * sign_g
+    gex = gamma_b * oi_b * float(contract_multiplier) * spot2 * signed
+    if skip_nulls:
+        gex = np.nan_to_num(gex)
 
-    # group by strike
+    # group by strike (bincount adds in row order, like a per-row loop)
     uniq, inv = np.unique(strike_b, return_inverse=True)
-    net_by = np.zeros(len(uniq), dtype=float)
-    abs_by = np.zeros(len(uniq), dtype=float)
-    for i, gi in enumerate(gex):
-        j = inv[i]
-        net_by[j] += float(gi)
+    net_by = np.bincount(inv, weights=gex, minlength=len(uniq))
     abs_by = np.abs(net_by)
 
     call_wall = None
@@ -144,49 +274,12 @@ def compute_levels_from_columnar_json(
             magnet_abs = float(abs_by[j_mag])
 
         # flip = first sign change of cumulative net_by across sorted strikes
-        cum = 0.0
-        prev_cum = None
-        prev_strike = None
-        for s, ng in zip(uniq, net_by):
-            cum += float(ng)
-            if prev_cum is not None:
-                if (prev_cum < 0 <= cum) or (prev_cum > 0 >= cum):
-                    flip = float(prev_strike if abs(prev_cum) <= abs(cum) else s)
-                    break
-            prev_cum = cum
-            prev_strike = float(s)
-
-    # ATM IV mid (rough): nearest strike to spot; average call+put IVs if present
-    atm_iv_mid = None
-    try:
-        # use all IVs (not band filtered) if available
-        if iv is not None and side_raw is not None:
-            iv_all = np.asarray(iv, dtype=float)
-            strike_all = np.asarray(strike, dtype=float)
-            side_all = np.array([_normalize_side(x) for x in side_raw])
-            valid = np.isfinite(iv_all) & (iv_all > 0) & np.isfinite(strike_all)
-            strike_v = strike_all[valid]
-            iv_v = iv_all[valid]
-            side_v = side_all[valid]
-            if len(strike_v):
-                atm = strike_v[np.argmin(np.abs(strike_v - spot))]
-                at_mask = strike_v == atm
-                c = np.nanmean(iv_v[at_mask & (side_v == "call")])
-                p = np.nanmean(iv_v[at_mask & (side_v == "put")])
-                vals = [x for x in [c, p] if np.isfinite(x) and x > 0]
-                if vals:
-                    # normalize % inputs
-                    m = float(np.mean(vals))
-                    if m > 5.0:
-                        m = m / 100.0
-                    atm_iv_mid = m
-    except Exception:
-        atm_iv_mid = None
-
-    # IV band to expiration: we don't know obs time-to-exp here; caller can fill later.
-    iv_upper = None
-    iv_lower = None
-    iv_move = None
+        cum = np.cumsum(net_by)
+        prev, cur = cum[:-1], cum[1:]
+        cross = ((prev < 0) & (cur >= 0)) | ((prev > 0) & (cur <= 0))
+        if cross.any():
+            j = int(np.argmax(cross))
+            flip = float(uniq[j] if abs(prev[j]) <= abs(cur[j]) else uniq[j + 1])
 
     return LevelFeatures(
         spot=float(spot),
@@ -200,8 +293,121 @@ def compute_levels_from_columnar_json(
         magnet_abs_gex=magnet_abs,
         vega_net=vega_net,
         vega_abs=vega_abs,
+        atm_iv_mid=None,
+        iv_upper=None,
+        iv_lower=None,
+        iv_move=None,
+    )
+
+
+def _atm_ivs(c: dict[str, np.ndarray], spot: float) -> tuple[float | None, np.ndarray, np.ndarray]:
+    """Strike nearest spot among rows with an IV (not band filtered); call and put IVs there."""
+    strike, iv, side = c["strike"], c["iv"], c["side"]
+    valid = np.isfinite(strike) & np.isfinite(iv) & (iv > 0)
+    if not valid.any():
+        return None, iv[:0], iv[:0]
+    idx = np.flatnonzero(valid)
+    atm = float(strike[idx[np.argmin(np.abs(strike[idx] - spot))]])
+    at = valid & (strike == atm)
+    return atm, iv[at & (side == "call")], iv[at & (side == "put")]
+
+
+def _with_iv_band(
+    lv: LevelFeatures, observed: datetime | None, expiration: date | None
+) -> LevelFeatures:
+    # the IV band to expiration needs the observation time; callers without it get None
+    if observed is None or expiration is None:
+        return lv
+    upper, lower, move, t_years = compute_iv_band(lv.spot, lv.atm_iv_mid, observed, expiration)
+    return replace(lv, iv_upper=upper, iv_lower=lower, iv_move=move, iv_t_years=t_years)
+
+
+def compute_levels_from_columnar_json(
+    js: dict[str, Any],
+    *,
+    band_pct: float = 0.05,
+    contract_multiplier: int = 100,
+    observed: datetime | None = None,
+    expiration: date | None = None,
+) -> LevelFeatures:
+    """Levels of one chain snapshot (dataset, watcher and bench).
+
+    Null inputs propagate NaN into their strike's GEX. atm_iv_mid is the mean of the call
+    and put IVs at the ATM strike, then /100 if it looks like a percent. The IV band is
+    filled when observed (naive US/Eastern, see to_eastern) and expiration are given.
+    """
+    c = _chain_arrays(js)
+    if len(c["strike"]) != len(js["strike"]):
+        raise ValueError("JSON missing/unaligned strike")
+
+    lv = _gex_levels(c, band_pct=band_pct, contract_multiplier=contract_multiplier)
+
+    atm_strike, calls, puts = _atm_ivs(c, lv.spot)
+    vals = [float(np.mean(x)) for x in (calls, puts) if len(x)]
+    atm_iv_mid = None
+    if vals:
+        # normalize % inputs
+        m = float(np.mean(vals))
+        atm_iv_mid = m / 100.0 if m > 5.0 else m
+
+    lv = replace(lv, atm_iv_mid=atm_iv_mid, atm_iv_strike=atm_strike)
+    return _with_iv_band(lv, observed, expiration)
+
+
+def compute_ps1_levels(
+    js: dict[str, Any],
+    *,
+    band_pct: float = 0.05,
+    contract_multiplier: int = 100,
+    spot: float | None = None,
+    observed: datetime | None = None,
+    expiration: date | None = None,
+    strike_tol: float = 0.01,
+) -> LevelFeatures:
+    """compute_levels_from_columnar_json as the PS1 Compute-LevelsFromFile does it (gt-payloads).
+
+    Null cells are skipped, sums run left to right, spot overrides underlyingPrice (the PS1
+    prefers the spot in the file name), call and put ATM IVs are normalized separately
+    (capped at 500%) and the key-level option mids are filled. The dataset/watcher features
+    keep the default path, so existing models see the inputs they were trained on.
+    """
+    c = _chain_arrays(js)
+    lv = _gex_levels(
+        c,
+        band_pct=band_pct,
+        contract_multiplier=contract_multiplier,
+        spot=spot,
+        skip_nulls=True,
+        sequential=True,
+    )
+
+    atm_strike, calls, puts = _atm_ivs(c, lv.spot)
+    atm_iv_call = atm_iv_put = atm_iv_mid = None
+    if atm_strike is not None and lv.spot > 0:
+        atm_iv_call = normalize_iv(_seq_mean(calls)) if len(calls) else None
+        atm_iv_put = normalize_iv(_seq_mean(puts)) if len(puts) else None
+        if atm_iv_call is not None and atm_iv_put is not None:
+            atm_iv_mid = (atm_iv_call + atm_iv_put) / 2.0
+        else:
+            atm_iv_mid = atm_iv_call if atm_iv_call is not None else atm_iv_put
+    else:
+        atm_strike = None
+
+    mid = _option_mids(js, len(c["strike"]))
+    key_mids = [
+        _directional_mid(c["strike"], c["side"], mid, lvl, lv.spot, strike_tol)
+        for lvl in (lv.call_wall, lv.put_wall, lv.magnet, lv.flip)
+    ]
+
+    lv = replace(
+        lv,
         atm_iv_mid=atm_iv_mid,
-        iv_upper=iv_upper,
-        iv_lower=iv_lower,
-        iv_move=iv_move,
+        atm_iv_call=atm_iv_call,
+        atm_iv_put=atm_iv_put,
+        atm_iv_strike=atm_strike,
+        call_wall_mid=key_mids[0],
+        put_wall_mid=key_mids[1],
+        magnet_mid=key_mids[2],
+        flip_mid=key_mids[3],
     )
+    return _with_iv_band(lv, observed, expiration)
@@ -0,0 +1,131 @@
+"""TradingView payload strings (PS1 V8.1.2 format, 28 integer fields per segment).
+
+`8.1.2~{H|D}~{interval}~` followed by `^`-joined records; prices are cents, pressure and
+IVs basis points, vega thousandths. Integers follow .NET `[int][math]::Round` semantics
+(half-to-even, 0 when the value does not fit an Int32).
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from gamma_trader.features.segments import strength_scores, weekly_expiration
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+VERSION = "8.1.2"
+INT32_MIN, INT32_MAX = -(2**31), 2**31 - 1
+
+CENTS = ["call_wall", "put_wall", "magnet", "flip"]
+IV_VEGA = ["iv_upper", "iv_lower", "atm_iv_call", "atm_iv_put", "vega_net", "vega_abs"]
+MIDS = ["call_wall_mid", "put_wall_mid", "magnet_mid", "flip_mid"]
+
+
+def _int32(x: np.ndarray) -> np.ndarray:
+    x = np.where(np.isfinite(x), x, 0.0)
+    x = np.where((x >= INT32_MIN) & (x <= INT32_MAX), x, 0.0)
+    return x.astype("int64")
+
+
+def to_cents(x) -> np.ndarray:
+    """PS1 To-CentsInt: 0 for null or <= 0."""
+    x = np.asarray(x, dtype=float)
+    return _int32(np.where(x > 0, np.round(x * 100.0), 0.0))
+
+
+def to_bp(x) -> np.ndarray:
+    """PS1 To-BpInt."""
+    return _int32(np.round(np.asarray(x, dtype=float) * 10000.0))
+
+
+def to_k(x) -> np.ndarray:
+    """PS1 To-KInt ("K" scale: value x 1000)."""
+    return _int32(np.round(np.asarray(x, dtype=float) * 1000.0))
+
+
+def net_round(x, digits: int) -> np.ndarray:
+    """.NET Math.Round(double, digits): scale, round half-to-even, unscale."""
+    p = 10.0**digits
+    x = np.asarray(x, dtype=float)
+    return np.where(np.abs(x) < 1e16, np.round(x * p) / p, x)
+
+
+def encode_levels(levels: pd.DataFrame) -> pd.DataFrame:
+    """Integer payload columns for a table of LevelFeatures rows (NaN for None)."""
+    import pandas as pd
+
+    enc = {c: to_cents(levels[c]) for c in CENTS}
+    enc["pressure"] = to_bp(net_round(levels["pressure"], 4))
+    enc["iv_upper"] = to_cents(levels["iv_upper"])
+    enc["iv_lower"] = to_cents(levels["iv_lower"])
+    enc["atm_iv_call"] = to_bp(levels["atm_iv_call"])
+    enc["atm_iv_put"] = to_bp(levels["atm_iv_put"])
+    enc["vega_net"] = to_k(levels["vega_net"])
+    enc["vega_abs"] = to_k(levels["vega_abs"])
+    enc.update({c: to_cents(levels[c]) for c in MIDS})
+    return pd.DataFrame(enc, index=levels.index)
+
+
+def payload_records(
+    day: str, slots, primary: pd.DataFrame, monthly: pd.DataFrame, abs_gex: pd.DataFrame
+) -> list[str]:
+    """One record per segment, in order. primary/monthly are encode_levels rows aligned to
+    slots (monthly all-zero where there is no monthly snapshot); abs_gex has the
+    call_wall/put_wall/magnet abs GEX used for the strength scores."""
+    ds = day.replace("-", "")
+    scores = [
+        strength_scores(abs_gex[c].to_numpy())
+        for c in ("call_wall_abs_gex", "put_wall_abs_gex", "magnet_abs_gex")
+    ]
+    p = primary[CENTS].to_numpy()
+    cols = np.column_stack(
+        [
+            np.asarray(slots, dtype="int64"),
+            p,
+            primary["pressure"].to_numpy(),
+            *scores,
+            p,  # legacy weekly fields: same as the primary levels
+            monthly[CENTS].to_numpy(),
+            primary[IV_VEGA].to_numpy(),
+            primary[MIDS].to_numpy(),
+        ]
+    )
+    return [ds + "," + ",".join(map(str, row)) for row in cols.tolist()]
+
+
+def build_payload(
+    mode: str,
+    interval_minutes: int,
+    records: list[str],
+    *,
+    max_segments: int = 450,
+    max_chars: int = 9000,
+) -> str:
+    """Header + the newest max_segments records, dropping the oldest until max_chars fits.
+
+    Like the PS1, the untrimmed payload is kept if not even one record fits.
+    """
+    header = f"{VERSION}~{mode}~{interval_minutes}~"
+    records = records[-max_segments:]
+    payload = header + "^".join(records)
+    if len(payload) > max_chars:
+        for i in range(1, len(records)):
+            trial = header + "^".join(records[i:])
+            if len(trial) <= max_chars:
+                return trial
+    return payload
+
+
+def payload_filename(
+    symbol: str, kind: str, day: str, mode: str, interval: int, *, weekly_exp_in_name: bool = True
+) -> str:
+    tag = day.replace("-", "")
+    mode_tag = f"{mode}{interval}"
+    if kind == "WEEKLY" and weekly_exp_in_name:
+        exp = weekly_expiration(date.fromisoformat(day)).strftime("%Y%m%d")
+        return f"Payload_V8_1_2_{symbol}_{kind}_{tag}_EXP{exp}_{mode_tag}.txt"
+    return f"Payload_V8_1_2_{symbol}_{kind}_{tag}_{mode_tag}.txt"
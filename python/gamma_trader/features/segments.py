@@ -0,0 +1,183 @@
+"""RTH slot bucketing, 0DTE/weekly/monthly segment selection and strength scores.
+
+Port of the PS1 (`ps/_ZeroDTE_Strategy_v8_1_2-SPX.ps1`) analysis steps, done on a
+metadata table of all snapshot files instead of one PSCustomObject per file.
+
+PS1 parity (`ps1_quirks=True`): `Get-Date -Hour .. -Minute .. -Second 0` keeps the current
+milliseconds, so the PS1's slot boundaries sit a fraction of a second after the minute and
+its third-Friday dates never equal a midnight expiration. In effect a snapshot stamped
+exactly on a boundary belongs to the slot that *ends* there (09:30:00 is outside RTH,
+16:00:00 is in the last slot) and no file is ever treated as a monthly. Pass
+`ps1_quirks=False` for [start, end) slots and real monthly matching.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from gamma_trader.ingest.snapshot import SnapshotMeta
+
+ET = "America/New_York"
+RTH_OPEN_MIN = 9 * 60 + 30
+RTH_CLOSE_MIN = 16 * 60
+KINDS = ("0DTE", "WEEKLY", "MONTHLY")
+
+
+def rth_slots(day: date, interval_minutes: int) -> list[tuple[datetime, datetime]]:
+    """(start, end) ET of each RTH slot; the last one is clipped at 16:00."""
+    interval = max(1, interval_minutes)
+    open_ = datetime(day.year, day.month, day.day) + timedelta(minutes=RTH_OPEN_MIN)
+    close = open_ + timedelta(minutes=RTH_CLOSE_MIN - RTH_OPEN_MIN)
+    out = []
+    cur = open_
+    while cur < close:
+        nxt = min(cur + timedelta(minutes=interval), close)
+        out.append((cur, nxt))
+        cur = nxt
+    return out
+
+
+def weekly_expiration(d: date) -> date:
+    """Friday on or after d."""
+    return d + timedelta(days=(4 - d.weekday()) % 7)
+
+
+def third_friday(year: int, month: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(4 - first.weekday()) % 7 + 14)
+
+
+def monthly_expiration(d: date) -> date:
+    """This month's third Friday, or next month's once it has passed."""
+    tf = third_friday(d.year, d.month)
+    if d <= tf:
+        return tf
+    return third_friday(d.year + d.month // 12, d.month % 12 + 1)
+
+
+def _weekday(days: np.ndarray) -> np.ndarray:
+    # datetime64[D] -> Monday=0 (1970-01-01 was a Thursday)
+    return (days.astype("int64") + 3) % 7
+
+
+def _monthly_expirations(days: np.ndarray) -> np.ndarray:
+    def third_fri(month_start):
+        first = month_start.astype("datetime64[D]")
+        return first + ((4 - _weekday(first)) % 7 + 14).astype("timedelta64[D]")
+
+    month = days.astype("datetime64[M]")
+    this = third_fri(month)
+    return np.where(days <= this, this, third_fri(month + 1))
+
+
+def snapshot_index(
+    files: Iterable[tuple[Path, SnapshotMeta]],
+    *,
+    interval_minutes: int = 15,
+    timestamp_source: str = "write-time",
+    local_tz: str | None = None,
+    hourly: bool = True,
+    ps1_quirks: bool = True,
+) -> pd.DataFrame:
+    """One row per snapshot usable for a segment (inside RTH and 0DTE/weekly/monthly).
+
+    timestamp_source:
+      - "write-time": file mtime (UTC); the segment date is the UTC date (PS1 default)
+      - "filename": the time in the name, read as local_tz wall time (default: system tz)
+
+    Columns: path, name, spot_in_name, expiration, observed, observed_et, date, slot
+    (-1 when not hourly), is_0dte, is_weekly, is_monthly.
+    """
+    files = list(files)
+    cols = ["path", "name", "spot_in_name", "expiration", "observed", "observed_et", "date", "slot"]
+    if not files:
+        return pd.DataFrame(columns=[*cols, "is_0dte", "is_weekly", "is_monthly"])
+
+    df = pd.DataFrame(
+        {
+            "path": [str(p) for p, _ in files],
+            "name": [p.name for p, _ in files],
+            "spot_in_name": [m.spot_in_name for _, m in files],
+            "expiration": pd.to_datetime([m.expiration for _, m in files]),
+        }
+    )
+
+    if timestamp_source == "write-time":
+        # .NET LastWriteTimeUtc has 100ns ticks
+        ns = np.array([os.stat(p).st_mtime_ns // 100 * 100 for p, _ in files], dtype="int64")
+        utc = pd.to_datetime(ns, unit="ns", utc=True)
+        observed = utc.tz_localize(None)
+        observed_et = utc.tz_convert(ET).tz_localize(None)
+    elif timestamp_source == "filename":
+        observed = pd.DatetimeIndex([m.observed_dt for _, m in files])
+        if local_tz:
+            tz = local_tz
+        else:
+            from dateutil.tz import tzlocal
+
+            tz = tzlocal()
+        local = observed.tz_localize(tz, ambiguous=False, nonexistent="shift_forward")
+        observed_et = local.tz_convert(ET).tz_localize(None)
+    else:
+        raise ValueError(f"unknown timestamp_source: {timestamp_source}")
+
+    df["observed"] = observed
+    df["observed_et"] = observed_et
+    day = observed.normalize()
+    df["date"] = day.strftime("%Y-%m-%d")
+
+    # slot bucketing on ET wall time, integer nanoseconds
+    since_open = (observed_et - observed_et.normalize()).as_unit("ns").asi8 - RTH_OPEN_MIN * 60 * 10**9
+    rth_ns = (RTH_CLOSE_MIN - RTH_OPEN_MIN) * 60 * 10**9
+    step = max(1, interval_minutes) * 60 * 10**9
+    if ps1_quirks:
+        in_rth = (since_open > 0) & (since_open <= rth_ns)
+        slot = (since_open - 1) // step
+    else:
+        in_rth = (since_open >= 0) & (since_open < rth_ns)
+        slot = since_open // step
+    df["slot"] = np.where(hourly, slot, -1)
+
+    days = day.values.astype("datetime64[D]")
+    exp = df["expiration"].values.astype("datetime64[D]")
+    weekly = days + ((4 - _weekday(days)) % 7).astype("timedelta64[D]")
+    df["is_0dte"] = exp == days
+    df["is_weekly"] = exp == weekly
+    df["is_monthly"] = False if ps1_quirks else exp == _monthly_expirations(days)
+
+    keep = in_rth & (df["is_0dte"] | df["is_weekly"] | df["is_monthly"]).to_numpy()
+    return df[keep].reset_index(drop=True)
+
+
+def select_segments(index: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Earliest snapshot per (date, slot) for each kind, indexed by (date, slot)."""
+    index = index.sort_values(["observed", "name"], kind="stable")
+    out = {}
+    for kind, flag in zip(KINDS, ("is_0dte", "is_weekly", "is_monthly")):
+        g = index[index[flag]].drop_duplicates(["date", "slot"])
+        out[kind] = g.set_index(["date", "slot"])
+    return out
+
+
+def strength_scores(cur_abs: np.ndarray) -> np.ndarray:
+    """0-100 score of each segment's abs GEX vs the last positive one before it (PS1
+    Compute-MagnetScore): 0 if none now, 50 with nothing to compare, else
+    50 + 25·log10(cur/prev) clamped and rounded half-to-even."""
+    cur = np.nan_to_num(np.asarray(cur_abs, dtype=float))
+    prev = pd.Series(np.where(cur > 0, cur, np.nan)).ffill().shift(1).fillna(0.0).to_numpy()
+    scores = np.zeros(len(cur), dtype=int)
+    for i, (c, p) in enumerate(zip(cur, prev)):
+        if c <= 0:
+            continue
+        if p <= 0:
+            scores[i] = 50
+            continue
+        scores[i] = round(min(100.0, max(0.0, 50.0 + 25.0 * math.log10(c / p))))
+    return scores
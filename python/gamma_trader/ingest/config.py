@@ -6,6 +6,13 @@ from pathlib import Path
 from typing import Any
 
 
+def load_config(path: str | Path) -> dict[str, Any]:
+    """Read a YAML config file (yaml is imported here to keep CLI startup fast)."""
+    import yaml
+
+    return yaml.safe_load(Path(path).read_text())
+
+
 def resolve_snapshot_dir(cfg: dict[str, Any]) -> Path:
     """Resolve snapshot_dir from config.
 
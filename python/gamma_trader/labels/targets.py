@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-import pandas as pd
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def add_direction_label(df: pd.DataFrame, *, horizon_bars: int = 1, price_col: str = "spot") -> pd.DataFrame:
@@ -0,0 +1,191 @@
+"""Lightweight in-process timers and counters for the hot path.
+
+Disabled by default; enable with `enable()` or `GT_METRICS=1`. While disabled, `timer()`
+returns a shared no-op object and `inc()`/`observe()` return immediately, so call sites
+can stay in place permanently.
+
+    with metrics.timer("features.levels"):
+        lvl = compute_levels_from_columnar_json(js)
+    metrics.inc("watch.skipped_unreadable")
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+# seconds; +Inf is implicit
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_ENABLED = os.getenv("GT_METRICS", "").strip().lower() not in ("", "0", "false", "no")
+
+
+class Histogram:
+    __slots__ = ("count", "counts", "max", "sum")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, v: float):
+        self.counts[bisect_left(BUCKETS, v)] += 1
+        self.count += 1
+        self.sum += v
+        self.max = max(self.max, v)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (max for the +Inf bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return BUCKETS[i] if i < len(BUCKETS) else self.max
+        return self.max
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms: dict[str, Histogram] = {}
+        self.counters: dict[str, float] = {}
+
+    def observe(self, name: str, seconds: float):
+        with self.lock:
+            h = self.histograms.get(name)
+            if h is None:
+                h = self.histograms[name] = Histogram()
+            h.observe(seconds)
+
+    def inc(self, name: str, n: float = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+
+REGISTRY = Registry()
+
+
+class _Timer:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        REGISTRY.observe(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def enable(on: bool = True):
+    global _ENABLED
+    _ENABLED = bool(on)
+
+
+def enabled() -> bool:
+    return _ENABLED
+
+
+def timer(name: str):
+    """Context manager recording the wall time of its body under `name`."""
+    return _Timer(name) if _ENABLED else _NULL_TIMER
+
+
+def observe(name: str, seconds: float):
+    if _ENABLED:
+        REGISTRY.observe(name, seconds)
+
+
+def inc(name: str, n: float = 1):
+    if _ENABLED:
+        REGISTRY.inc(name, n)
+
+
+def _esc(s: str) -> str:
+    return s.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus(prefix: str = "gt", registry: Registry | None = None) -> str:
+    """Prometheus text exposition: `<prefix>_stage_seconds` histograms and `<prefix>_events_total`."""
+    reg = registry or REGISTRY
+    with reg.lock:
+        hists = {k: (list(h.counts), h.count, h.sum) for k, h in reg.histograms.items()}
+        counters = dict(reg.counters)
+
+    lines = []
+    if hists:
+        fam = f"{prefix}_stage_seconds"
+        lines.append(f"# HELP {fam} Wall time per pipeline stage.")
+        lines.append(f"# TYPE {fam} histogram")
+        for name in sorted(hists):
+            counts, count, total = hists[name]
+            lbl = f'stage="{_esc(name)}"'
+            cum = 0
+            for le, c in zip(BUCKETS, counts):
+                cum += c
+                lines.append(f'{fam}_bucket{{{lbl},le="{le:g}"}} {cum}')
+            lines.append(f'{fam}_bucket{{{lbl},le="+Inf"}} {count}')
+            lines.append(f"{fam}_sum{{{lbl}}} {total:.9g}")
+            lines.append(f"{fam}_count{{{lbl}}} {count}")
+    if counters:
+        fam = f"{prefix}_events_total"
+        lines.append(f"# HELP {fam} Pipeline event counts (skipped/unreadable files, ...).")
+        lines.append(f"# TYPE {fam} counter")
+        for name in sorted(counters):
+            lines.append(f'{fam}{{event="{_esc(name)}"}} {counters[name]:g}')
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def write_prometheus(path: Path, prefix: str = "gt"):
+    """Atomically write render_prometheus() to path (for readers such as the API)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(render_prometheus(prefix), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def summary_table(registry: Registry | None = None) -> str:
+    reg = registry or REGISTRY
+    with reg.lock:
+        hists = {k: h for k, h in reg.histograms.items()}
+        counters = dict(reg.counters)
+
+    lines = [f"{'stage':<28} {'count':>7} {'total s':>9} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9}"]
+    for name in sorted(hists):
+        h = hists[name]
+        mean = h.sum / h.count if h.count else 0.0
+        lines.append(
+            f"{name:<28} {h.count:>7} {h.sum:>9.3f} {mean * 1000:>9.2f} "
+            f"{h.quantile(0.95) * 1000:>9.2f} {h.max * 1000:>9.2f}"
+        )
+    for name in sorted(counters):
+        lines.append(f"{name:<28} {counters[name]:>7g}")
+    return "\n".join(lines)
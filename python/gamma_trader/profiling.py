@@ -0,0 +1,227 @@
+"""Opt-in profiling for the gt-* entry points.
+
+Enabled with `--profile [cprofile|sample]` on a command or `GT_PROFILE=cprofile|sample`
+in the environment. A `Profiler` is used as a context manager around the work to
+measure; it can be entered repeatedly (the watcher enters it once per snapshot) and
+accumulates until `finish()` writes the outputs to `--profile-dir`:
+
+- cprofile: `<name>-<stamp>.prof` (load with pstats/snakeviz)
+- sample:   `<name>-<stamp>.collapsed` (flamegraph.pl / speedscope input)
+- both:     `<name>-<stamp>.txt` with the top-N hotspots and tracemalloc peak memory
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+MODES = ("cprofile", "sample")
+
+
+def _mode_from_env() -> str:
+    v = os.getenv("GT_PROFILE", "").strip().lower()
+    if v in ("", "0", "false", "no"):
+        return ""
+    return v if v in MODES else "cprofile"
+
+
+def add_profile_args(ap: argparse.ArgumentParser, *, window: bool = False):
+    ap.add_argument(
+        "--profile",
+        nargs="?",
+        const="cprofile",
+        default=_mode_from_env(),
+        choices=["", *MODES],
+        help="Profile this run: cprofile (deterministic, default) or sample. Also GT_PROFILE=...",
+    )
+    ap.add_argument("--profile-dir", default="data/profiles")
+    ap.add_argument("--profile-top", type=int, default=25, help="Hotspots listed in the summary")
+    ap.add_argument("--profile-interval-ms", type=float, default=5.0, help="Sampling period for --profile sample")
+    if window:
+        ap.add_argument(
+            "--profile-files",
+            type=int,
+            default=20,
+            help="Profile this many snapshots, then write the results (0 = until exit)",
+        )
+
+
+class Profiler:
+    def __init__(
+        self,
+        name: str,
+        *,
+        mode: str = "cprofile",
+        out_dir: Path = Path("data/profiles"),
+        top: int = 25,
+        interval: float = 0.005,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"unknown profile mode: {mode}")
+        self.name = name
+        self.mode = mode
+        self.out_dir = Path(out_dir)
+        self.top = top
+        self.interval = interval
+
+        self.windows = 0
+        self.elapsed = 0.0
+        self._count_window = True
+        self.finished = False
+
+        self._started = False
+        self._prof = cProfile.Profile() if mode == "cprofile" else None
+        self._samples: Counter[tuple[str, ...]] = Counter()
+        self._active: int | None = None  # thread ident being sampled
+        self._stop = threading.Event()
+        self._sampler: threading.Thread | None = None
+        self._t0 = 0.0
+
+    # -- collection --
+
+    def _start(self):
+        self._started = True
+        tracemalloc.start()
+        if self.mode == "sample":
+            self._sampler = threading.Thread(target=self._sample_loop, name="gt-profiler", daemon=True)
+            self._sampler.start()
+
+    def __enter__(self):
+        if self.finished:
+            return self
+        if not self._started:
+            self._start()
+        self._t0 = time.perf_counter()
+        self._count_window = True
+        if self._prof is not None:
+            self._prof.enable()
+        else:
+            self._active = threading.get_ident()
+        return self
+
+    def __exit__(self, *exc):
+        if self.finished:
+            return False
+        if self._prof is not None:
+            self._prof.disable()
+        else:
+            self._active = None
+        self.elapsed += time.perf_counter() - self._t0
+        if self._count_window:
+            self.windows += 1
+        return False
+
+    def skip(self):
+        """Do not count the current window (its event turned out to be a no-op)."""
+        self._count_window = False
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            tid = self._active
+            if tid is None:
+                continue
+            frame = sys._current_frames().get(tid)
+            stack = []
+            while frame is not None:
+                co = frame.f_code
+                stack.append(f"{co.co_name} ({os.path.basename(co.co_filename)}:{co.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self._samples[tuple(reversed(stack))] += 1
+
+    # -- reporting --
+
+    def _sample_summary(self) -> list[str]:
+        total = sum(self._samples.values())
+        self_n: Counter[str] = Counter()
+        incl_n: Counter[str] = Counter()
+        for stack, n in self._samples.items():
+            self_n[stack[-1]] += n
+            for f in set(stack):
+                incl_n[f] += n
+
+        lines = [f"{total:,} samples every {self.interval * 1000:g}ms", "", f"{'self%':>7} {'incl%':>7}  frame"]
+        for f, n in self_n.most_common(self.top):
+            lines.append(f"{100.0 * n / total:>6.1f}% {100.0 * incl_n[f] / total:>6.1f}%  {f}")
+        return lines
+
+    def finish(self) -> Path | None:
+        """Stop collecting, write outputs and print the summary. Safe to call twice."""
+        if self.finished:
+            return None
+        self.finished = True
+        if not self._started:
+            return None
+
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+        _, peak = tracemalloc.get_traced_memory()
+        snap = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        base = self.out_dir / f"{self.name}-{datetime.now():%Y%m%d-%H%M%S}"
+
+        lines = [
+            f"{self.name}: {self.mode} profile, {self.windows} window(s), {self.elapsed:.3f}s profiled",
+            f"peak traced memory: {peak / 2**20:.1f} MiB",
+            "",
+        ]
+        if self._prof is not None:
+            self._prof.dump_stats(str(base) + ".prof")
+            buf = io.StringIO()
+            pstats.Stats(self._prof, stream=buf).sort_stats("tottime").print_stats(self.top)
+            lines.append(buf.getvalue().strip())
+        else:
+            with open(str(base) + ".collapsed", "w", encoding="utf-8") as f:
+                f.writelines(";".join(stack) + f" {n}\n" for stack, n in self._samples.most_common())
+            lines.extend(self._sample_summary())
+
+        lines.extend(["", "top allocation sites (live at finish):"])
+        for st in snap.statistics("lineno")[: min(self.top, 10)]:
+            lines.append(f"  {st.size / 1024:>10.1f} KiB  {st.traceback}")
+
+        summary = "\n".join(lines) + "\n"
+        Path(str(base) + ".txt").write_text(summary, encoding="utf-8")
+        print(summary)
+        print(f"profile -> {base}.*")
+        return base
+
+
+def from_args(name: str, args: argparse.Namespace) -> Profiler | None:
+    if not getattr(args, "profile", ""):
+        return None
+    return Profiler(
+        name,
+        mode=args.profile,
+        out_dir=Path(args.profile_dir),
+        top=args.profile_top,
+        interval=args.profile_interval_ms / 1000.0,
+    )
+
+
+@contextlib.contextmanager
+def session(name: str, args: argparse.Namespace):
+    """Profile the body if args asked for it; always writes the results, even on error."""
+    prof = from_args(name, args)
+    if prof is None:
+        yield None
+        return
+    try:
+        with prof:
+            yield prof
+    finally:
+        prof.finish()
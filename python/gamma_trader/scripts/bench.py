@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+from gamma_trader.bench.suite import compare, run_suite
+
+
+def _run(args):
+    res = run_suite(
+        contracts=args.contracts,
+        strike_spacing=args.strike_spacing,
+        nan_density=args.nan_density,
+        days=args.days,
+        snapshots_per_day=args.snapshots_per_day,
+        repeat=args.repeat,
+        seed=args.seed,
+    )
+
+    print(f"{'benchmark':<36} {'median':>12} {'min':>12}")
+    for name, r in res["results"].items():
+        if "error" in r:
+            print(f"{name:<36} error: {r['error']}")
+            continue
+        print(f"{name:<36} {r['median_s'] * 1000:>10.3f}ms {r['min_s'] * 1000:>10.3f}ms")
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(res, indent=2), encoding="utf-8")
+    print(f"wrote -> {out}")
+
+
+def _compare(args):
+    base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+    new = json.loads(Path(args.new).read_text(encoding="utf-8"))
+    if base["meta"].get("params") != new["meta"].get("params"):
+        print("warning: benchmark params differ between runs")
+
+    rows = compare(base, new, threshold=args.threshold)
+    print(f"{base['meta'].get('commit') or args.base} -> {new['meta'].get('commit') or args.new}")
+    print(f"{'benchmark':<36} {'base':>12} {'new':>12} {'ratio':>8}")
+    for r in rows:
+        b = "-" if r["base_s"] is None else f"{r['base_s'] * 1000:.3f}ms"
+        if r["missing"] or r["error"]:
+            n = "missing" if r["missing"] else "error"
+        else:
+            n = "-" if r["new_s"] is None else f"{r['new_s'] * 1000:.3f}ms"
+        ratio = "-" if r["ratio"] is None else f"{r['ratio']:.2f}x"
+        flag = "  REGRESSION" if r["regression"] else ""
+        print(f"{r['name']:<36} {b:>12} {n:>12} {ratio:>8}{flag}")
+
+    bad = [r for r in rows if r["regression"]]
+    if bad:
+        raise SystemExit(f"{len(bad)} benchmark(s) regressed more than {args.threshold:.0%}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmarks on synthetic SPX chains")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    run = sub.add_parser("run", help="Run the suite and save results as JSON")
+    run.add_argument("--out", default="data/bench/results.json")
+    run.add_argument("--contracts", type=int, default=2000)
+    run.add_argument("--strike-spacing", type=float, default=5.0)
+    run.add_argument("--nan-density", type=float, default=0.0)
+    run.add_argument("--days", type=int, default=5)
+    run.add_argument("--snapshots-per-day", type=int, default=27)
+    run.add_argument("--repeat", type=int, default=5)
+    run.add_argument("--seed", type=int, default=0)
+    run.set_defaults(func=_run)
+
+    cmp_ = sub.add_parser("compare", help="Flag regressions between two result files")
+    cmp_.add_argument("base")
+    cmp_.add_argument("new")
+    cmp_.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown, e.g. 0.10 = 10%%")
+    cmp_.set_defaults(func=_compare)
+
+    args = ap.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
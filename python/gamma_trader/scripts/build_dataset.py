@@ -2,35 +2,37 @@ from __future__ import annotations
 
 import argparse
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import pandas as pd
-import yaml
-
+from gamma_trader import metrics, profiling
 from gamma_trader.ingest.snapshot import iter_snapshot_files, load_snapshot_json
-from gamma_trader.features.levels import compute_levels_from_columnar_json
-from gamma_trader.labels.targets import add_direction_label
 
+if TYPE_CHECKING:
+    import pandas as pd
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--config", required=True)
-    ap.add_argument("--out", default="data/dataset.parquet")
-    args = ap.parse_args()
 
-    cfg = yaml.safe_load(Path(args.config).read_text())
-    from gamma_trader.ingest.config import resolve_snapshot_dir
+def build_dataset(cfg: dict, snap_dir: Path) -> pd.DataFrame:
+    """Compute levels for every snapshot in snap_dir and label each day."""
+    import pandas as pd
+
+    from gamma_trader.features.levels import compute_levels_from_columnar_json, to_eastern
+    from gamma_trader.labels.targets import add_direction_label
 
-    snap_dir = resolve_snapshot_dir(cfg)
     glob = cfg.get("snapshot_glob", "*.json")
 
     rows = []
     for path, meta in iter_snapshot_files(snap_dir, glob=glob):
-        js = load_snapshot_json(path)
-        lvl = compute_levels_from_columnar_json(
-            js,
-            band_pct=float(cfg.get("band_pct", 0.05)),
-            contract_multiplier=int(cfg.get("contract_multiplier", 100)),
-        )
+        with metrics.timer("ingest.parse"):
+            js = load_snapshot_json(path)
+        with metrics.timer("features.levels"):
+            lvl = compute_levels_from_columnar_json(
+                js,
+                band_pct=float(cfg.get("band_pct", 0.05)),
+                contract_multiplier=int(cfg.get("contract_multiplier", 100)),
+                observed=to_eastern(meta.observed_dt, cfg.get("timezone")),
+                expiration=meta.expiration,
+            )
+        metrics.inc("build.snapshots")
         rows.append(
             {
                 "ts": meta.observed_dt,
@@ -48,12 +50,15 @@ def main():
                 "vega_net": lvl.vega_net,
                 "vega_abs": lvl.vega_abs,
                 "atm_iv_mid": lvl.atm_iv_mid,
+                "iv_upper": lvl.iv_upper,
+                "iv_lower": lvl.iv_lower,
+                "iv_move": lvl.iv_move,
             }
         )
 
     df = pd.DataFrame(rows)
     if df.empty:
-        raise SystemExit("No snapshots found")
+        raise FileNotFoundError(f"No snapshots matching {glob} in {snap_dir}")
 
     df = df.sort_values(["date", "ts"]).reset_index(drop=True)
 
@@ -63,14 +68,40 @@ def main():
     horizon_bars = max(1, horizon_min // interval)
 
     parts = []
-    for d, g in df.groupby("date", sort=False):
-        parts.append(add_direction_label(g, horizon_bars=horizon_bars, price_col="spot"))
-    out = pd.concat(parts, ignore_index=True)
-
-    out_path = Path(args.out)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    out.to_parquet(out_path, index=False)
-    print(f"wrote {len(out):,} rows -> {out_path}")
+    with metrics.timer("labels.direction"):
+        for d, g in df.groupby("date", sort=False):
+            parts.append(add_direction_label(g, horizon_bars=horizon_bars, price_col="spot"))
+        out = pd.concat(parts, ignore_index=True)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--config", required=True)
+    ap.add_argument("--out", default="data/dataset.parquet")
+    ap.add_argument("--metrics", action="store_true", help="Print per-stage timings (or set GT_METRICS=1)")
+    profiling.add_profile_args(ap)
+    args = ap.parse_args()
+    if args.metrics:
+        metrics.enable()
+
+    with profiling.session("gt-build-dataset", args):
+        from gamma_trader.ingest.config import load_config, resolve_snapshot_dir
+
+        cfg = load_config(args.config)
+
+        try:
+            out = build_dataset(cfg, resolve_snapshot_dir(cfg))
+        except FileNotFoundError as e:
+            raise SystemExit(str(e)) from None
+
+        out_path = Path(args.out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        with metrics.timer("write.dataset"):
+            out.to_parquet(out_path, index=False)
+        print(f"wrote {len(out):,} rows -> {out_path}")
+        if metrics.enabled():
+            print(metrics.summary_table())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hmac
+import importlib
+import json
+import os
+import socketserver
+import threading
+import time
+import traceback
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from gamma_trader import metrics
+from gamma_trader.daemon import daemon_address, request, token_path, write_token
+
+INPUTS = ("config", "data", "model")
+STAGES = {"config": "ingest.config", "data": "ingest.dataset", "model": "ingest.model"}
+
+
+class Refused(Exception):
+    """A request the daemon will not serve; the client falls back to a local run."""
+
+
+class _State:
+    """The config/model/dataset given to `serve`, cached and reloaded when a file changes.
+
+    Clients cannot choose other inputs (joblib.load unpickles, i.e. runs code) or write
+    outside out_dir: they send their paths and get Refused if those differ.
+    """
+
+    def __init__(self, *, config: str, data: str, model: str, out_dir: str, token: str):
+        self.paths = {k: Path(v).resolve() for k, v in zip(INPUTS, (config, data, model))}
+        self.out_dir = Path(out_dir).resolve()
+        self.token = token
+        self.cache: dict[tuple[str, str], tuple[int, Any]] = {}
+        self.started = time.time()
+
+    def check_inputs(self, a: dict):
+        for kind in INPUTS:
+            if kind in a and Path(a[kind]).resolve() != self.paths[kind]:
+                raise Refused(f"--{kind} {a[kind]} is not the daemon's ({self.paths[kind]})")
+
+    def out_path(self, path: str) -> Path:
+        p = Path(path).resolve()
+        if not p.is_relative_to(self.out_dir):
+            raise Refused(f"{p} is outside the daemon's --out-dir ({self.out_dir})")
+        return p
+
+    def _get(self, kind: str, load: Callable[[Path], Any]) -> Any:
+        p = self.paths[kind]
+        mtime = p.stat().st_mtime_ns
+        hit = self.cache.get((kind, str(p)))
+        if hit is not None and hit[0] == mtime:
+            return hit[1]
+        with metrics.timer(STAGES[kind]):
+            obj = load(p)
+        self.cache[(kind, str(p))] = (mtime, obj)
+        return obj
+
+    def config(self) -> dict:
+        from gamma_trader.ingest.config import load_config
+
+        return self._get("config", load_config)
+
+    def model(self) -> dict:
+        import joblib
+
+        return self._get("model", joblib.load)
+
+    def data(self):
+        import pandas as pd
+
+        return self._get("data", pd.read_parquet)
+
+
+STATE: _State | None = None  # set by `serve`
+
+
+def _cmd_ping(a: dict) -> tuple[dict, str]:
+    loaded = [f"{kind}: {path}" for kind, path in STATE.cache]
+    res = {"pid": os.getpid(), "uptime_s": time.time() - STATE.started, "loaded": loaded}
+    return res, f"gt-daemon pid={res['pid']} up {res['uptime_s']:.0f}s; " + ("; ".join(loaded) or "nothing loaded")
+
+
+def _cmd_plan(a: dict) -> tuple[dict, str]:
+    from gamma_trader.scripts.make_plan import plan_for_day, write_plan
+
+    out = STATE.out_path(a["out"])
+    day, text = plan_for_day(STATE.config(), STATE.data(), STATE.model(), a.get("date", ""))
+    write_plan(text, out)
+    return {"date": day, "out": str(out)}, f"wrote -> {out}"
+
+
+def _cmd_plans(a: dict) -> tuple[dict, str]:
+    from gamma_trader.scripts.make_plan import plans_for_days, select_days, write_plans
+
+    out_dir = STATE.out_path(a["out_dir"])
+    df = STATE.data()
+    days = select_days(df, a.get("start", ""), a.get("end", ""))
+    if not days:
+        raise SystemExit(f"no rows between {a.get('start') or 'start'} and {a.get('end') or 'end'}")
+    idx = write_plans(plans_for_days(STATE.config(), df, STATE.model(), days), out_dir)
+    return {"dates": days, "index": str(idx)}, f"wrote {len(days)} plan(s) -> {idx}"
+
+
+def _cmd_export(a: dict) -> tuple[dict, str]:
+    from gamma_trader.scripts.export_for_dashboard import dashboard_outputs, write_dashboard
+
+    out_plan, out_series = STATE.out_path(a["out_plan"]), STATE.out_path(a["out_series"])
+    plan, g = dashboard_outputs(STATE.config(), STATE.data(), STATE.model())
+    write_dashboard(plan, g, out_plan=out_plan, out_series=out_series)
+    return {"plan": plan}, f"wrote {a['out_plan']} and {a['out_series']}"
+
+
+def _cmd_score(a: dict) -> tuple[dict, str]:
+    """P(up) for every snapshot of a day (default: newest)."""
+    df = STATE.data()
+    pack = STATE.model()
+    day = a.get("date") or max(df["date"].unique())
+    g = df[df["date"] == day].sort_values("ts")
+    if g.empty:
+        raise SystemExit(f"no rows for date={day}")
+    with metrics.timer("inference.predict_proba"):
+        p = pack["model"].predict_proba(g[pack["features"]])[:, 1]
+    rows = [{"ts": str(ts), "p_up": float(x)} for ts, x in zip(g["ts"], p)]
+    text = "\n".join(f"{r['ts']}  {r['p_up']:.3f}" for r in rows)
+    return {"date": day, "rows": rows}, text
+
+
+def _cmd_reload(a: dict) -> tuple[dict, str]:
+    n = len(STATE.cache)
+    STATE.cache.clear()
+    return {"dropped": n}, f"dropped {n} cached object(s)"
+
+
+def _cmd_stats(a: dict) -> tuple[dict, str]:
+    return {}, metrics.summary_table()
+
+
+COMMANDS: dict[str, Callable[[dict], tuple[dict, str]]] = {
+    "ping": _cmd_ping,
+    "plan": _cmd_plan,
+    "plans": _cmd_plans,
+    "export": _cmd_export,
+    "score": _cmd_score,
+    "reload": _cmd_reload,
+    "stats": _cmd_stats,
+}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    # the server runs one request at a time, so a client that connects and never sends a
+    # full line must not hold it for longer than this
+    timeout = 5.0
+
+    def handle(self):
+        try:
+            line = self.rfile.readline()
+        except OSError:  # timed out or reset before a request line
+            return
+        if not line:
+            return
+        # anything not caught here is logged by socketserver and closes the connection,
+        # which makes the client run the command locally
+        try:
+            req = json.loads(line)
+            if not hmac.compare_digest(str(req.get("token", "")), STATE.token):
+                raise Refused("bad or missing token")
+            cmd = req.get("cmd")
+            args = req.get("args") or {}
+            STATE.check_inputs(args)
+            if cmd == "shutdown":
+                resp = {"ok": True, "output": "gt-daemon stopping"}
+                # shutdown() blocks until serve_forever returns; call it off this thread
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            elif cmd in COMMANDS:
+                with metrics.timer(f"daemon.{cmd}"):
+                    res, out = COMMANDS[cmd](args)
+                resp = {"ok": True, "result": res, "output": out}
+            else:
+                resp = {"ok": False, "error": f"unknown command: {cmd}"}
+        except Refused as e:
+            resp = {"ok": False, "refused": True, "error": str(e)}
+        except SystemExit as e:
+            resp = {"ok": False, "error": str(e)}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            traceback.print_exc()
+            resp = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        self.wfile.write(json.dumps(resp).encode("utf-8") + b"\n")
+
+
+class _Server(socketserver.TCPServer):
+    # one request at a time: keeps the caches simple and pandas single-threaded
+    allow_reuse_address = True
+
+
+def _serve(args):
+    global STATE
+
+    host, port = daemon_address(args.addr)
+    if host not in ("127.0.0.1", "localhost", "::1"):
+        raise SystemExit("gt-daemon only listens on localhost")
+
+    tpath = token_path(args.addr)
+    STATE = _State(
+        config=args.config, data=args.data, model=args.model, out_dir=args.out_dir, token=write_token(tpath)
+    )
+    metrics.enable()
+    # warm the caches so the first client call is already fast
+    for kind in INPUTS:
+        try:
+            getattr(STATE, kind)()
+        except FileNotFoundError:
+            print(f"not preloaded (missing): {STATE.paths[kind]}")
+    # the heavy modules used by the command handlers
+    for mod in ("gamma_trader.scripts.export_for_dashboard", "gamma_trader.scripts.make_plan"):
+        importlib.import_module(mod)
+
+    try:
+        with _Server((host, port), _Handler) as srv:
+            print(f"gt-daemon listening on {host}:{port} (pid={os.getpid()}, token: {tpath})")
+            print(f"inputs: {', '.join(str(p) for p in STATE.paths.values())}; outputs under {STATE.out_dir}")
+            with contextlib.suppress(KeyboardInterrupt):
+                srv.serve_forever()
+    finally:
+        tpath.unlink(missing_ok=True)
+
+
+def _client(args):
+    extra: dict[str, Any] = {}
+    if args.cmd in ("plan", "plans", "score", "export"):
+        extra = {k: str(Path(getattr(args, k)).resolve()) for k in INPUTS if getattr(args, k)}
+    if args.cmd == "plan":
+        extra.update(date=args.date, out=str(Path(args.out).resolve()))
+    elif args.cmd == "plans":
+        extra.update(start=args.start, end=args.end, out_dir=str(Path(args.out_dir).resolve()))
+    elif args.cmd == "score":
+        extra.update(date=args.date)
+    elif args.cmd == "export":
+        extra.update(out_plan=str(Path(args.out_plan).resolve()), out_series=str(Path(args.out_series).resolve()))
+
+    try:
+        resp = request(args.cmd, addr=args.addr, **extra)
+    except RuntimeError as e:  # DaemonUnavailable included
+        raise SystemExit(str(e)) from None
+    if args.json:
+        print(json.dumps(resp.get("result", {}), indent=2))
+    elif resp.get("output"):
+        print(resp["output"])
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Resident worker keeping the model and dataset in memory")
+    ap.add_argument("--addr", default="", help="host:port (default GT_DAEMON_ADDR or 127.0.0.1:8765)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    def paths(p):
+        # clients only send these to be checked against the daemon's; default: the daemon's
+        p.add_argument("--config", default="")
+        p.add_argument("--data", default="")
+        p.add_argument("--model", default="")
+        return p
+
+    p = sub.add_parser("serve", help="Run the daemon in the foreground")
+    p.add_argument("--config", default="configs/config.yaml")
+    p.add_argument("--data", default="data/dataset.parquet")
+    p.add_argument("--model", default="data/model.joblib")
+    p.add_argument("--out-dir", default="data", help="Clients may only write below this directory")
+    p.set_defaults(func=_serve)
+
+    p = paths(sub.add_parser("plan", help="Like gt-make-plan"))
+    p.add_argument("--date", default="")
+    p.add_argument("--out", default="data/plan.md")
+    p = paths(sub.add_parser("plans", help="Like gt-make-plan --start/--end (empty = all dates)"))
+    p.add_argument("--start", default="")
+    p.add_argument("--end", default="")
+    p.add_argument("--out-dir", default="data/plans")
+    p = paths(sub.add_parser("score", help="P(up) per snapshot for a day"))
+    p.add_argument("--date", default="")
+    p = paths(sub.add_parser("export", help="Like gt-export-dashboard"))
+    p.add_argument("--out-plan", default="data/latest_plan.json")
+    p.add_argument("--out-series", default="data/timeseries.parquet")
+    for name in ("ping", "reload", "stats", "shutdown"):
+        sub.add_parser(name)
+    for name, p in sub.choices.items():
+        if name != "serve":
+            p.set_defaults(func=_client)
+            p.add_argument("--json", action="store_true", help="Print the raw result")
+
+    args = ap.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
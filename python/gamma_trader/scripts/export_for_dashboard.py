@@ -3,10 +3,41 @@ from __future__ import annotations
 import argparse
 import json
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import joblib
-import pandas as pd
-import yaml
+from gamma_trader import metrics, profiling
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def dashboard_outputs(cfg: dict, df: pd.DataFrame, pack: dict) -> tuple[dict, pd.DataFrame]:
+    """Score the newest day in df; return (latest plan dict, that day's rows with p_up)."""
+    from gamma_trader.scripts.make_plan import plan_json
+
+    df = df.sort_values(["date", "ts"]).reset_index(drop=True)
+    day = df["date"].max()
+    g = df[df["date"] == day].copy()
+
+    model = pack["model"]
+    feats = pack["features"]
+
+    with metrics.timer("inference.predict_proba"):
+        p = model.predict_proba(g[feats])[:, 1]
+    g["p_up"] = p
+
+    last = g.sort_values("ts").iloc[-1]
+    plan = plan_json(cfg, day, last, float(last["p_up"]))
+    return plan, g
+
+
+def write_dashboard(plan: dict, g: pd.DataFrame, *, out_plan: Path, out_series: Path):
+    with metrics.timer("write.plan"):
+        out_plan.write_text(json.dumps(plan, indent=2), encoding="utf-8")
+
+    with metrics.timer("write.series"):
+        out_series.parent.mkdir(parents=True, exist_ok=True)
+        g.to_parquet(out_series, index=False)
 
 
 def main():
@@ -16,49 +47,36 @@ def main():
     ap.add_argument("--model", default="data/model.joblib")
     ap.add_argument("--out-plan", default="data/latest_plan.json")
     ap.add_argument("--out-series", default="data/timeseries.parquet")
+    ap.add_argument("--daemon", action="store_true", help="Ask a running gt-daemon (falls back to local)")
+    profiling.add_profile_args(ap)
     args = ap.parse_args()
 
-    cfg = yaml.safe_load(Path(args.config).read_text())
-    symbol = cfg.get("symbol", "SPX")
+    if args.daemon:
+        from gamma_trader.daemon import forward
 
-    df = pd.read_parquet(args.data).sort_values(["date", "ts"]).reset_index(drop=True)
-    day = df["date"].max()
-    g = df[df["date"] == day].copy()
+        paths = {k: str(Path(getattr(args, k)).resolve()) for k in ("config", "data", "model", "out_plan", "out_series")}
+        if forward("export", **paths):
+            return
 
-    pack = joblib.load(args.model)
-    model = pack["model"]
-    feats = pack["features"]
+    with profiling.session("gt-export-dashboard", args):
+        import joblib
+        import pandas as pd
 
-    p = model.predict_proba(g[feats])[:, 1]
-    g["p_up"] = p
+        from gamma_trader.ingest.config import load_config
 
-    last = g.sort_values("ts").iloc[-1]
-    p_last = float(last["p_up"])
-    bias = "UP" if p_last >= 0.55 else "DOWN" if p_last <= 0.45 else "NEUTRAL"
-
-    plan = {
-        "symbol": symbol,
-        "date": day,
-        "target": f"next {cfg.get('label',{}).get('horizon_minutes', cfg.get('interval_minutes',15))}m direction",
-        "latest": {
-            "ts": str(last["ts"]),
-            "spot": float(last["spot"]),
-            "call_wall": None if pd.isna(last.get("call_wall")) else float(last["call_wall"]),
-            "put_wall": None if pd.isna(last.get("put_wall")) else float(last["put_wall"]),
-            "magnet": None if pd.isna(last.get("magnet")) else float(last["magnet"]),
-            "flip": None if pd.isna(last.get("flip")) else float(last["flip"]),
-            "pressure": None if pd.isna(last.get("pressure")) else float(last["pressure"]),
-            "p_up": p_last,
-            "bias": bias,
-        },
-    }
-
-    Path(args.out_plan).write_text(json.dumps(plan, indent=2), encoding="utf-8")
-
-    Path(args.out_series).parent.mkdir(parents=True, exist_ok=True)
-    g.to_parquet(args.out_series, index=False)
-
-    print(f"wrote {args.out_plan} and {args.out_series}")
+        cfg = load_config(args.config)
+
+        with metrics.timer("ingest.dataset"):
+            df = pd.read_parquet(args.data)
+        with metrics.timer("ingest.model"):
+            pack = joblib.load(args.model)
+
+        plan, g = dashboard_outputs(cfg, df, pack)
+        write_dashboard(plan, g, out_plan=Path(args.out_plan), out_series=Path(args.out_series))
+
+        print(f"wrote {args.out_plan} and {args.out_series}")
+        if metrics.enabled():
+            print(metrics.summary_table())
 
 
 if __name__ == "__main__":
@@ -2,42 +2,31 @@ from __future__ import annotations
 
 import argparse
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
-import joblib
-import pandas as pd
-import yaml
+from gamma_trader import metrics, profiling
 
+if TYPE_CHECKING:
+    import pandas as pd
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--config", required=True)
-    ap.add_argument("--data", default="data/dataset.parquet")
-    ap.add_argument("--model", default="data/model.joblib")
-    ap.add_argument("--date", default="")
-    ap.add_argument("--out", default="data/plan.md")
-    args = ap.parse_args()
 
-    cfg = yaml.safe_load(Path(args.config).read_text())
-    pack = joblib.load(args.model)
-    model = pack["model"]
-    feats = pack["features"]
+def bias_for(p_up: float) -> str:
+    return "UP" if p_up >= 0.55 else "DOWN" if p_up <= 0.45 else "NEUTRAL"
 
-    df = pd.read_parquet(args.data)
-    if args.date:
-        day = args.date
-    else:
-        day = max(df["date"].unique())
 
-    g = df[df["date"] == day].sort_values("ts")
-    if g.empty:
-        raise SystemExit(f"no rows for date={day}")
+def _target(cfg: dict) -> str:
+    return f"next {cfg.get('label',{}).get('horizon_minutes', cfg.get('interval_minutes',15))}m direction"
+
+
+def _num(x: Any) -> float | None:
+    import pandas as pd
+
+    return None if pd.isna(x) else float(x)
 
-    last = g.iloc[-1]
-    X = g[feats]
-    p = model.predict_proba(X)[:, 1]
 
-    p_last = float(p[-1])
-    bias = "UP" if p_last >= 0.55 else "DOWN" if p_last <= 0.45 else "NEUTRAL"
+def render_plan(cfg: dict, day: str, last: Any, p_last: float) -> str:
+    """Markdown plan for one day from its last snapshot row and that row's P(up)."""
+    bias = bias_for(p_last)
 
     lines = []
     lines.append(f"# Gamma Trader Plan — {cfg.get('symbol','SPX')} — {day}")
@@ -51,7 +40,7 @@ def main():
     lines.append(f"- Pressure: {last['pressure']}")
     lines.append("")
     lines.append("## Model")
-    lines.append(f"- Target: next {cfg.get('label',{}).get('horizon_minutes', cfg.get('interval_minutes',15))}m direction")
+    lines.append(f"- Target: {_target(cfg)}")
     lines.append(f"- P(up) last snapshot: {p_last:.3f}")
     lines.append(f"- Bias: **{bias}**")
     lines.append("")
@@ -59,11 +48,184 @@ def main():
     lines.append("- If price is between put wall and call wall: expect mean reversion / pinning more than trend unless P(up) is extreme.")
     lines.append("- Near magnet: watch for stalling; fading extensions often has better R/R.")
     lines.append("- If price breaks beyond wall with rising abs GEX: trend days become more likely.")
+    return "\n".join(lines) + "\n"
+
+
+def plan_json(cfg: dict, day: str, last: Any, p_last: float) -> dict:
+    """The latest_plan.json structure for one day."""
+    return {
+        "symbol": cfg.get("symbol", "SPX"),
+        "date": day,
+        "target": _target(cfg),
+        "latest": {
+            "ts": str(last["ts"]),
+            "spot": float(last["spot"]),
+            "call_wall": _num(last.get("call_wall")),
+            "put_wall": _num(last.get("put_wall")),
+            "magnet": _num(last.get("magnet")),
+            "flip": _num(last.get("flip")),
+            "pressure": _num(last.get("pressure")),
+            "p_up": p_last,
+            "bias": bias_for(p_last),
+        },
+    }
+
+
+def score_days(df: pd.DataFrame, pack: dict, days: list[str]) -> pd.DataFrame:
+    """Rows of the given days sorted by (date, ts) with p_up, from one predict_proba call."""
+    g = df[df["date"].isin(days)].sort_values(["date", "ts"], kind="stable")
+    if g.empty:
+        return g.assign(p_up=[])
+    with metrics.timer("inference.predict_proba"):
+        p = pack["model"].predict_proba(g[pack["features"]])[:, 1]
+    return g.assign(p_up=p)
+
+
+def plan_for_day(cfg: dict, df: pd.DataFrame, pack: dict, day: str = "") -> tuple[str, str]:
+    """Score one day (default: newest) and return (day, markdown)."""
+    if not day:
+        day = max(df["date"].unique())
+
+    g = score_days(df, pack, [day])
+    if g.empty:
+        raise SystemExit(f"no rows for date={day}")
+
+    last = g.iloc[-1]
+    return day, render_plan(cfg, day, last, float(last["p_up"]))
+
 
-    out = Path(args.out)
+def select_days(df: pd.DataFrame, start: str = "", end: str = "") -> list[str]:
+    """Dates in df within [start, end] (ISO strings, either side open when empty)."""
+    days = sorted(df["date"].unique())
+    return [d for d in days if (not start or d >= start) and (not end or d <= end)]
+
+
+def plans_for_days(cfg: dict, df: pd.DataFrame, pack: dict, days: list[str]) -> list[dict]:
+    """Plans for many days from a single scoring pass.
+
+    One dict per day with the markdown ("md"), the JSON plan ("plan") and the
+    fields of the index summary.
+    """
+    scored = score_days(df, pack, days)
+    out = []
+    with metrics.timer("render.plans"):
+        for day, g in scored.groupby("date", sort=True):
+            last = g.iloc[-1]
+            p_last = float(last["p_up"])
+            plan = plan_json(cfg, day, last, p_last)
+            out.append(
+                {
+                    "date": day,
+                    "snapshots": len(g),
+                    "p_up_mean": float(g["p_up"].mean()),
+                    **plan["latest"],
+                    "md": render_plan(cfg, day, last, p_last),
+                    "plan": plan,
+                }
+            )
+    return out
+
+
+def write_plan(text: str, out: Path):
     out.parent.mkdir(parents=True, exist_ok=True)
-    out.write_text("\n".join(lines) + "\n", encoding="utf-8")
-    print(f"wrote -> {out}")
+    with metrics.timer("write.plan"):
+        out.write_text(text, encoding="utf-8")
+
+
+def write_plans(plans: list[dict], out_dir: Path) -> Path:
+    """plan_<date>.md/.json per day plus index.json and index.md; returns the index.md path."""
+    import json
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    index = []
+    with metrics.timer("write.plan"):
+        for p in plans:
+            md = out_dir / f"plan_{p['date']}.md"
+            js = out_dir / f"plan_{p['date']}.json"
+            md.write_text(p["md"], encoding="utf-8")
+            js.write_text(json.dumps(p["plan"], indent=2), encoding="utf-8")
+            row = {k: v for k, v in p.items() if k not in ("md", "plan")}
+            index.append({**row, "md": md.name, "json": js.name})
+
+        (out_dir / "index.json").write_text(json.dumps(index, indent=2), encoding="utf-8")
+
+        def f(x, spec):
+            return "" if x is None else format(x, spec)
+
+        lines = [
+            "# Gamma Trader plans",
+            "",
+            "| Date | Snapshots | Spot | Call wall | Put wall | Magnet | Flip | P(up) last | P(up) mean | Bias |",
+            "|---|---:|---:|---:|---:|---:|---:|---:|---:|---|",
+        ]
+        for r in index:
+            lines.append(
+                f"| [{r['date']}]({r['md']}) | {r['snapshots']} | {r['spot']:.2f} | {f(r['call_wall'], 'g')} "
+                f"| {f(r['put_wall'], 'g')} | {f(r['magnet'], 'g')} | {f(r['flip'], 'g')} "
+                f"| {r['p_up']:.3f} | {r['p_up_mean']:.3f} | {r['bias']} |"
+            )
+        idx = out_dir / "index.md"
+        idx.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return idx
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--config", required=True)
+    ap.add_argument("--data", default="data/dataset.parquet")
+    ap.add_argument("--model", default="data/model.joblib")
+    ap.add_argument("--date", default="")
+    ap.add_argument("--out", default="data/plan.md")
+    ap.add_argument("--start", default="", help="Batch mode: first date (YYYY-MM-DD)")
+    ap.add_argument("--end", default="", help="Batch mode: last date (YYYY-MM-DD)")
+    ap.add_argument("--all", action="store_true", help="Batch mode: every date in the dataset")
+    ap.add_argument("--out-dir", default="data/plans", help="Batch mode: plans + index.md/index.json")
+    ap.add_argument("--daemon", action="store_true", help="Ask a running gt-daemon (falls back to local)")
+    profiling.add_profile_args(ap)
+    args = ap.parse_args()
+
+    batch = bool(args.start or args.end or args.all)
+    if batch and args.date:
+        raise SystemExit("--date cannot be combined with --start/--end/--all")
+
+    if args.daemon:
+        from gamma_trader.daemon import forward
+
+        if batch:
+            paths = {k: str(Path(getattr(args, k)).resolve()) for k in ("config", "data", "model", "out_dir")}
+            if forward("plans", start=args.start, end=args.end, **paths):
+                return
+        else:
+            paths = {k: str(Path(getattr(args, k)).resolve()) for k in ("config", "data", "model", "out")}
+            if forward("plan", date=args.date, **paths):
+                return
+
+    with profiling.session("gt-make-plan", args):
+        import joblib
+        import pandas as pd
+
+        from gamma_trader.ingest.config import load_config
+
+        cfg = load_config(args.config)
+        with metrics.timer("ingest.model"):
+            pack = joblib.load(args.model)
+        with metrics.timer("ingest.dataset"):
+            df = pd.read_parquet(args.data)
+
+        if batch:
+            days = select_days(df, args.start, args.end)
+            if not days:
+                raise SystemExit(f"no rows between {args.start or 'start'} and {args.end or 'end'}")
+            idx = write_plans(plans_for_days(cfg, df, pack, days), Path(args.out_dir))
+            print(f"wrote {len(days)} plan(s) -> {idx}")
+        else:
+            _, text = plan_for_day(cfg, df, pack, args.date)
+
+            out = Path(args.out)
+            write_plan(text, out)
+            print(f"wrote -> {out}")
+        if metrics.enabled():
+            print(metrics.summary_table())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import argparse
+import os
+import re
+from dataclasses import asdict
+from datetime import date
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from gamma_trader import metrics, profiling
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+NEWLINES = {"native": os.linesep, "lf": "\n", "crlf": "\r\n"}
+
+
+def _levels_for(job: tuple) -> dict:
+    """LevelFeatures of one snapshot as a dict (module level so process pools can pickle it)."""
+    from gamma_trader.features.levels import compute_ps1_levels
+    from gamma_trader.ingest.snapshot import load_snapshot_json
+
+    path, spot, observed_et, expiration, band_pct, contract_multiplier, strike_tol = job
+    with metrics.timer("ingest.parse"):
+        js = load_snapshot_json(Path(path))
+    with metrics.timer("features.levels"):
+        lvl = compute_ps1_levels(
+            js,
+            band_pct=band_pct,
+            contract_multiplier=contract_multiplier,
+            spot=spot,
+            observed=observed_et,
+            expiration=expiration,
+            strike_tol=strike_tol,
+        )
+    return asdict(lvl)
+
+
+def segment_levels(cfg: dict, snaps: pd.DataFrame, *, jobs: int = 1) -> pd.DataFrame:
+    """LevelFeatures (NaN for None) per snapshot path, IV band taken at its ET observation."""
+    import pandas as pd
+
+    snaps = snaps.drop_duplicates("path")
+    band_pct = float(cfg.get("band_pct", 0.05))
+    mult = int(cfg.get("contract_multiplier", 100))
+    tol = float(cfg.get("strike_match_tolerance", 0.01))
+    todo = [
+        (r.path, r.spot_in_name, r.observed_et, r.expiration.date(), band_pct, mult, tol)
+        for r in snaps.itertuples(index=False)
+    ]
+    if jobs > 1 and len(todo) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=jobs) as ex:
+            rows = list(ex.map(_levels_for, todo, chunksize=max(1, len(todo) // (jobs * 4))))
+    else:
+        rows = [_levels_for(t) for t in todo]
+    return pd.DataFrame(rows, index=pd.Index(snaps["path"], name="path")).astype(float)
+
+
+def _day_segments(seg: pd.DataFrame, day: str, mode: str, hourly: bool) -> pd.DataFrame:
+    """Segment snapshots of one day indexed by slot: all slots (H) or the first one (D)."""
+    if day not in seg.index.get_level_values("date"):
+        return seg.iloc[:0]
+    g = seg.xs(day, level="date").sort_index()
+    if mode == "H":
+        return g if hourly else g.iloc[:0]
+    key = 0 if hourly else -1
+    return g.loc[[key]] if key in g.index else g.iloc[:0]
+
+
+def build_payloads(
+    cfg: dict,
+    files: list,
+    *,
+    kinds: tuple[str, ...] = ("0DTE", "WEEKLY"),
+    modes: tuple[str, ...] = ("H", "D"),
+    lookback_days: int = 20,
+    only_date: str = "",
+    max_chars: int = 9000,
+    max_segments: int = 450,
+    timestamp_source: str = "write-time",
+    hourly: bool = True,
+    ps1_quirks: bool = True,
+    jobs: int = 1,
+) -> list[tuple[str, str, str, str]]:
+    """(date, kind, mode, payload) for the newest lookback_days dates (or only_date).
+
+    Only the snapshots that end up as a segment of an emitted date are parsed.
+    """
+    import pandas as pd
+
+    from gamma_trader.features.payload import build_payload, encode_levels, payload_records
+    from gamma_trader.features.segments import select_segments, snapshot_index
+
+    interval = int(cfg.get("interval_minutes", 15))
+    with metrics.timer("payloads.index"):
+        idx = snapshot_index(
+            files,
+            interval_minutes=interval,
+            timestamp_source=timestamp_source,
+            local_tz=cfg.get("timezone"),
+            hourly=hourly,
+            ps1_quirks=ps1_quirks,
+        )
+        segs = select_segments(idx)
+
+    def dates(kind):
+        return set(segs[kind].index.get_level_values("date"))
+
+    all_dates = sorted(dates("0DTE") | dates("WEEKLY"))
+    want = [d for d in all_dates if d == only_date] if only_date else all_dates[-lookback_days:]
+    if not want:
+        return []
+
+    used = pd.concat([s[s.index.get_level_values("date").isin(want)] for s in segs.values()])
+    levels = segment_levels(cfg, used, jobs=jobs)
+    enc = encode_levels(levels)
+    zeros = pd.DataFrame(0, index=[0], columns=enc.columns)
+    abs_cols = ["call_wall_abs_gex", "put_wall_abs_gex", "magnet_abs_gex"]
+    m = segs["MONTHLY"]
+
+    out = []
+    with metrics.timer("payloads.build"):
+        for day in want:
+            for kind in kinds:
+                for mode in modes:
+                    g = _day_segments(segs[kind], day, mode, hourly)
+                    if g.empty:
+                        continue
+                    monthly = pd.concat(
+                        [enc.loc[[m.at[(day, s), "path"]]] if (day, s) in m.index else zeros for s in g.index],
+                        ignore_index=True,
+                    )
+                    slots = g.index.to_numpy() if mode == "H" else [0]
+                    records = payload_records(
+                        day, slots, enc.loc[g["path"]], monthly, levels.loc[g["path"], abs_cols]
+                    )
+                    text = build_payload(
+                        mode, interval, records, max_segments=max_segments, max_chars=max_chars
+                    )
+                    out.append((day, kind, mode, text))
+    return out
+
+
+def write_payloads(
+    payloads: list[tuple[str, str, str, str]],
+    out_dir: Path,
+    *,
+    symbol: str,
+    interval: int,
+    newline: str = os.linesep,
+    weekly_exp_in_name: bool = True,
+) -> list[Path]:
+    """One UTF-8 (no BOM) file per payload, with a trailing newline like PS7 Set-Content."""
+    from gamma_trader.features.payload import payload_filename
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    with metrics.timer("write.payload"):
+        for day, kind, mode, text in payloads:
+            p = out_dir / payload_filename(
+                symbol, kind, day, mode, interval, weekly_exp_in_name=weekly_exp_in_name
+            )
+            p.write_bytes((text + newline).encode("utf-8"))
+            paths.append(p)
+    return paths
+
+
+def parse_only_date(s: str) -> str:
+    """--only-date as yyyy-mm-dd ("" stays ""); accepts yyyy-mm-dd or yyyymmdd."""
+    s = s.strip()
+    if not s:
+        return ""
+    if re.fullmatch(r"\d{4}-\d{2}-\d{2}|\d{8}", s):
+        d = s.replace("-", "")
+        try:
+            return date(int(d[:4]), int(d[4:6]), int(d[6:])).isoformat()
+        except ValueError:
+            pass
+    raise ValueError(f"not a yyyy-mm-dd or yyyymmdd date: {s!r}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="TradingView payloads (port of the V8.1.2 PS1)")
+    ap.add_argument("--config", required=True)
+    ap.add_argument("--snapshot-dir", default="", help="Default: snapshot_dir from the config")
+    ap.add_argument(
+        "--include-historical", action="store_true", help="Also scan <snapshot-dir>/_Historical"
+    )
+    ap.add_argument("--historical-dir", default="")
+    ap.add_argument("--out-dir", default="data/payloads")
+    ap.add_argument("--lookback-days", type=int, default=20)
+    ap.add_argument("--only-date", default="", help="yyyy-mm-dd or yyyymmdd")
+    ap.add_argument("--kinds", choices=["0DTE", "WEEKLY", "BOTH"], default="BOTH")
+    ap.add_argument("--modes", choices=["H", "D", "HD"], default="HD", help="H: per slot, D: one per day")
+    ap.add_argument("--max-payload-chars", type=int, default=9000)
+    ap.add_argument("--max-segments", type=int, default=450)
+    ap.add_argument(
+        "--timestamp-source",
+        choices=["write-time", "filename"],
+        default="write-time",
+        help="Observation time: file mtime (PS1 default) or the name, read in the config timezone",
+    )
+    ap.add_argument("--daily-snapshots", action="store_true", help="PS1 -HourlySnapshots:$false")
+    ap.add_argument("--no-weekly-exp-in-name", action="store_true")
+    ap.add_argument(
+        "--fix-ps1-quirks",
+        action="store_true",
+        help="Use [start, end) RTH slots and monthly context (output then differs from the PS1)",
+    )
+    ap.add_argument("--newline", choices=sorted(NEWLINES), default="native")
+    ap.add_argument("--jobs", type=int, default=1, help="Parse snapshots in this many processes")
+    ap.add_argument("--metrics", action="store_true", help="Print per-stage timings (or set GT_METRICS=1)")
+    profiling.add_profile_args(ap)
+    args = ap.parse_args()
+    if args.metrics:
+        metrics.enable()
+    if args.lookback_days < 1:
+        raise SystemExit("--lookback-days must be >= 1")
+    if args.max_payload_chars < 1000:
+        raise SystemExit("--max-payload-chars must be >= 1000")
+    if args.max_segments < 1:
+        raise SystemExit("--max-segments must be >= 1")
+
+    try:
+        only = parse_only_date(args.only_date)
+    except ValueError as e:
+        raise SystemExit(f"--only-date: {e}") from None
+
+    with profiling.session("gt-payloads", args):
+        from gamma_trader.ingest.config import load_config, resolve_snapshot_dir
+        from gamma_trader.ingest.snapshot import iter_snapshot_files
+
+        cfg = load_config(args.config)
+        symbol = cfg.get("symbol", "SPX")
+        interval = int(cfg.get("interval_minutes", 15))
+
+        snap_dir = Path(args.snapshot_dir) if args.snapshot_dir else resolve_snapshot_dir(cfg)
+        if not snap_dir.is_dir():
+            raise SystemExit(f"snapshot dir not found: {snap_dir}")
+        dirs = [snap_dir]
+        hist = Path(args.historical_dir) if args.historical_dir else snap_dir / "_Historical"
+        if args.include_historical and hist.is_dir():
+            dirs.append(hist)
+
+        with metrics.timer("ingest.scan"):
+            glob = cfg.get("snapshot_glob", "*.json")
+            files = [f for d in dirs for f in iter_snapshot_files(d, glob=glob)]
+
+        payloads = build_payloads(
+            cfg,
+            files,
+            kinds=("0DTE", "WEEKLY") if args.kinds == "BOTH" else (args.kinds,),
+            modes=tuple(args.modes),
+            lookback_days=args.lookback_days,
+            only_date=only,
+            max_chars=args.max_payload_chars,
+            max_segments=args.max_segments,
+            timestamp_source=args.timestamp_source,
+            hourly=not args.daily_snapshots,
+            ps1_quirks=not args.fix_ps1_quirks,
+            jobs=args.jobs,
+        )
+        if not payloads:
+            which = f" for {only}" if only else ""
+            raise SystemExit(f"no payload dates found{which} in {len(files)} snapshot(s)")
+
+        paths = write_payloads(
+            payloads,
+            Path(args.out_dir),
+            symbol=symbol,
+            interval=interval,
+            newline=NEWLINES[args.newline],
+            weekly_exp_in_name=not args.no_weekly_exp_in_name,
+        )
+        for (day, kind, mode, text), p in sorted(zip(payloads, paths)):
+            print(f" - {day} {kind} {mode} | len={len(text)} | {p}")
+        print(f"wrote {len(paths)} payload(s) -> {args.out_dir}")
+        if metrics.enabled():
+            print(metrics.summary_table())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,478 @@
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from gamma_trader.ingest.snapshot import iter_snapshot_files
+
+
+@dataclass
+class FileRecord:
+    name: str
+    ts: str
+    date: str
+    partial: bool = False
+    t_land: float | None = None  # monotonic, file fully written
+    t_plan: float | None = None  # plan json shows this ts
+    t_series: float | None = None  # first series rewrite at/after t_plan
+    t_api: float | None = None  # API /plan/latest shows this ts
+    status: str = "pending"  # published|superseded|dropped
+
+    def latency_ms(self, attr: str) -> float | None:
+        t = getattr(self, attr)
+        if t is None or self.t_land is None:
+            return None
+        return (t - self.t_land) * 1000.0
+
+
+def _parse_speed(s: str) -> float | None:
+    """'realtime' -> 1.0, '10' / '10x' -> 10.0, 'max' -> None (no pacing)."""
+    s = s.strip().lower()
+    if s == "max":
+        return None
+    if s == "realtime":
+        return 1.0
+    v = float(s.rstrip("x"))
+    if v <= 0:
+        raise ValueError("--speed must be > 0")
+    return v
+
+
+def _pct(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    xs = sorted(values)
+    k = min(len(xs) - 1, max(0, round(q / 100.0 * (len(xs) - 1))))
+    return xs[k]
+
+
+def _latency_stats(values: list[float]) -> dict:
+    if not values:
+        return {"n": 0}
+    return {
+        "n": len(values),
+        "mean_ms": sum(values) / len(values),
+        "p50_ms": _pct(values, 50),
+        "p90_ms": _pct(values, 90),
+        "p99_ms": _pct(values, 99),
+        "max_ms": max(values),
+    }
+
+
+class _Tracker:
+    """Matches published plan timestamps back to replayed files."""
+
+    def __init__(self, records: list[FileRecord]):
+        self.records = records
+        self.by_ts = {r.ts: r for r in records}
+        self.lock = threading.Lock()
+
+    def saw(self, attr: str, ts: str, t: float) -> bool:
+        """Record that ts showed up at t. False if ts is a replayed file that is not marked
+        landed yet, so the caller should look again instead of moving on."""
+        with self.lock:
+            rec = self.by_ts.get(ts)
+            if rec is None:
+                return True
+            if rec.t_land is None:
+                return False
+            if getattr(rec, attr) is None:
+                setattr(rec, attr, t)
+            if attr == "t_plan":
+                rec.status = "published"
+                # anything older that never showed up individually was overtaken
+                for r in self.records:
+                    if r.ts < ts and r.t_land is not None and r.status == "pending":
+                        r.status = "superseded"
+            return True
+
+    def series_written(self, t: float):
+        with self.lock:
+            for r in self.records:
+                if r.t_plan is not None and r.t_series is None and r.t_plan <= t:
+                    r.t_series = t
+
+    def outstanding(self, *, api: bool) -> int:
+        with self.lock:
+            n = 0
+            for r in self.records:
+                if r.t_land is None:
+                    continue
+                if r.status == "pending" or (
+                    r.status == "published" and (r.t_series is None or (api and r.t_api is None))
+                ):
+                    n += 1
+            return n
+
+
+def _mtime(p: Path) -> int | None:
+    try:
+        return p.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _poll_files(
+    tracker: _Tracker,
+    plan: Path,
+    series: Path,
+    stop: threading.Event,
+    interval: float,
+    *,
+    plan_m: int | None = None,
+    series_m: int | None = None,
+):
+    """Watch plan/series for rewrites; plan_m/series_m are the mtimes to ignore (files
+    left over from before the run)."""
+    while not stop.is_set():
+        m = _mtime(plan)
+        if m is not None and m != plan_m:
+            t = time.monotonic()
+            try:
+                ts = json.loads(plan.read_text(encoding="utf-8"))["latest"]["ts"]
+                if tracker.saw("t_plan", str(ts), t):
+                    plan_m = m
+            except (OSError, ValueError, KeyError, TypeError):
+                pass  # mid-write; try again next tick
+
+        m = _mtime(series)
+        if m is not None and m != series_m:
+            series_m = m
+            tracker.series_written(time.monotonic())
+
+        stop.wait(interval)
+
+
+def _poll_api(tracker: _Tracker, api: str, stop: threading.Event, interval: float):
+    url = api.rstrip("/") + "/plan/latest"
+    while not stop.is_set():
+        try:
+            with urllib.request.urlopen(url, timeout=2) as resp:
+                body = json.loads(resp.read().decode("utf-8"))
+            tracker.saw("t_api", str(body["latest"]["ts"]), time.monotonic())
+        except (OSError, ValueError, KeyError, TypeError, http.client.HTTPException):
+            pass  # API down or mid-restart; poll again
+        stop.wait(interval)
+
+
+def _check_api(api: str, plan: Path):
+    """Exit unless the API at api serves plan as /plan/latest (it reports its data dir on
+    /health), instead of waiting --timeout for a plan it will never show."""
+    url = api.rstrip("/") + "/health"
+    try:
+        with urllib.request.urlopen(url, timeout=2) as resp:
+            served = json.loads(resp.read().decode("utf-8")).get("data_dir")
+    except (OSError, ValueError, AttributeError, http.client.HTTPException) as e:
+        raise SystemExit(f"API not reachable at {url}: {e}") from None
+    if not served or (Path(served) / "latest_plan.json").resolve() != plan.resolve():
+        raise SystemExit(
+            f"the API serves {served or '?'}/latest_plan.json, not {plan}; "
+            f"start it with GT_DATA_DIR={plan.parent} or pass --plan <its data dir>/latest_plan.json"
+        )
+
+
+def _write_file(src: Path, dst: Path, *, partial: bool, partial_delay: float, landed=None):
+    """Copy src to dst; landed() is called right before the last bytes are written, so it
+    always runs before the watcher can see the complete file."""
+    data = src.read_bytes()
+    if dst.exists():
+        # watcher only reacts to creation events
+        dst.unlink()
+    with dst.open("wb") as f:
+        if partial and len(data) > 1:
+            cut = len(data) // 2
+            f.write(data[:cut])
+            f.flush()
+            time.sleep(partial_delay)
+            data = data[cut:]
+        if landed is not None:
+            landed()
+        f.write(data)
+
+
+def _spawn_watcher(cfg: dict, args, watch_dir: Path) -> subprocess.Popen:
+    import yaml
+
+    scratch_cfg = dict(cfg)
+    scratch_cfg["snapshot_dir"] = str(watch_dir)
+    cfg_path = watch_dir.parent / "replay_config.yaml"
+    cfg_path.write_text(yaml.safe_dump(scratch_cfg), encoding="utf-8")
+
+    cmd = [
+        sys.executable,
+        "-u",
+        "-m",
+        "gamma_trader.scripts.watch_snapshots",
+        "--config",
+        str(cfg_path),
+        "--model",
+        args.model,
+        "--out-plan",
+        args.plan,
+        "--out-series",
+        args.series,
+        "--metrics-out",
+        str(Path(args.plan).parent / "metrics_watch.prom") if args.watcher_metrics else "",
+    ]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+    # wait until the observer is scheduled, then keep draining its output
+    for line in proc.stdout:
+        if line.startswith("watching"):
+            break
+    else:
+        raise SystemExit(f"watcher exited early (rc={proc.wait()})")
+    threading.Thread(target=_drain, args=(proc.stdout,), daemon=True).start()
+    return proc
+
+
+def _drain(stream):
+    for _ in stream:
+        pass
+
+
+def _print_summary(report: dict):
+    c = report["counts"]
+    print(
+        f"files: {c['files']:,} | published: {c['published']:,} | superseded: {c['superseded']:,} "
+        f"| dropped: {c['dropped']:,} | late: {c['late']:,}"
+    )
+    t = report["throughput"]
+    print(
+        f"replay: {t['replay_seconds']:.2f}s | {t['files_per_sec']:.2f} files/s in | "
+        f"output: {t['output_seconds']:.2f}s (drain {t['drain_seconds']:.2f}s) | "
+        f"{t['published_per_sec']:.2f} plans/s out"
+    )
+    for key, label in [("land_to_plan", "land->plan"), ("land_to_series", "land->series"), ("land_to_api", "land->api")]:
+        s = report["latency"][key]
+        if not s["n"]:
+            continue
+        print(
+            f"{label:<14} n={s['n']:<5} p50={s['p50_ms']:.1f}ms p90={s['p90_ms']:.1f}ms "
+            f"p99={s['p99_ms']:.1f}ms max={s['max_ms']:.1f}ms"
+        )
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay historical snapshots into a watch folder and measure gt-watch latency")
+    ap.add_argument("--config", required=True)
+    ap.add_argument("--source", default="", help="Folder with historical snapshots (default: config snapshot_dir)")
+    ap.add_argument("--watch-dir", default="data/replay/watch")
+    ap.add_argument("--date", default="", help="Only replay snapshots observed on this date (YYYY-MM-DD)")
+    ap.add_argument("--limit", type=int, default=0)
+    ap.add_argument("--speed", default="max", help="realtime | <N>x | max")
+    ap.add_argument("--max-gap", type=float, default=60.0, help="Cap (seconds) on any single pause after scaling")
+    ap.add_argument("--burst", type=int, default=1, help="Land files in groups of N with no pause inside a group")
+    ap.add_argument("--partial-prob", type=float, default=0.0, help="Fraction of files written in two halves")
+    ap.add_argument("--partial-delay-ms", type=float, default=300.0)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--plan", default="data/replay/latest_plan.json")
+    ap.add_argument("--series", default="data/replay/timeseries.parquet")
+    ap.add_argument("--api", default="", help="Base URL to poll /plan/latest, e.g. http://127.0.0.1:8000")
+    ap.add_argument("--spawn-watcher", action="store_true", help="Start gt-watch on the watch dir for the run")
+    ap.add_argument("--model", default="data/model.joblib")
+    ap.add_argument(
+        "--watcher-metrics",
+        action="store_true",
+        help="Let the spawned watcher rewrite metrics_watch.prom per file (adds to the latencies)",
+    )
+    ap.add_argument("--poll-ms", type=float, default=5.0)
+    ap.add_argument("--late-ms", type=float, default=2000.0)
+    ap.add_argument("--timeout", type=float, default=10.0, help="Seconds to wait for stragglers after the last file")
+    ap.add_argument("--report", default="data/replay/report.json")
+    args = ap.parse_args()
+
+    from gamma_trader.ingest.config import load_config, resolve_snapshot_dir
+
+    cfg = load_config(args.config)
+
+    source = Path(args.source) if args.source else resolve_snapshot_dir(cfg)
+    watch_dir = Path(args.watch_dir)
+    if watch_dir.resolve() == source.resolve():
+        raise SystemExit("--watch-dir must differ from the snapshot source")
+    watch_dir.mkdir(parents=True, exist_ok=True)
+    for p in (Path(args.plan), Path(args.series), Path(args.report)):
+        p.parent.mkdir(parents=True, exist_ok=True)
+
+    speed = _parse_speed(args.speed)
+    rng = random.Random(args.seed)
+
+    files = [(p, m) for p, m in iter_snapshot_files(source, glob=cfg.get("snapshot_glob", "*.json"))]
+    if args.date:
+        files = [(p, m) for p, m in files if m.observed_dt.date().isoformat() == args.date]
+    files.sort(key=lambda x: x[1].observed_dt)
+    if args.limit:
+        files = files[: args.limit]
+    if not files:
+        raise SystemExit("No snapshots found")
+
+    records = [
+        FileRecord(
+            name=p.name,
+            ts=str(m.observed_dt),
+            date=m.observed_dt.date().isoformat(),
+            partial=rng.random() < args.partial_prob,
+        )
+        for p, m in files
+    ]
+    tracker = _Tracker(records)
+
+    plan_path, series_path = Path(args.plan), Path(args.series)
+    if args.api:
+        _check_api(args.api, plan_path)
+    # files and outputs of an earlier run would be matched as this run's results
+    for p in watch_dir.glob(cfg.get("snapshot_glob", "*.json")):
+        p.unlink()
+    if args.spawn_watcher:
+        plan_path.unlink(missing_ok=True)
+        series_path.unlink(missing_ok=True)
+    plan_m0, series_m0 = _mtime(plan_path), _mtime(series_path)
+
+    watcher = _spawn_watcher(cfg, args, watch_dir) if args.spawn_watcher else None
+
+    stop = threading.Event()
+    pollers = [
+        threading.Thread(
+            target=_poll_files,
+            args=(tracker, plan_path, series_path, stop, args.poll_ms / 1000.0),
+            kwargs={"plan_m": plan_m0, "series_m": series_m0},
+            daemon=True,
+        )
+    ]
+    if args.api:
+        pollers.append(
+            threading.Thread(target=_poll_api, args=(tracker, args.api, stop, args.poll_ms / 1000.0), daemon=True)
+        )
+    for t in pollers:
+        t.start()
+
+    print(f"replaying {len(files):,} snapshots {source} -> {watch_dir} (speed={args.speed}, burst={args.burst})")
+
+    writers: list[threading.Thread] = []
+    t0 = time.monotonic()
+    due = t0
+    try:
+        for i, ((path, meta), rec) in enumerate(zip(files, records)):
+            if i and i % max(1, args.burst) == 0 and speed is not None:
+                gap = (meta.observed_dt - files[i - args.burst][1].observed_dt).total_seconds() / speed
+                due += min(max(0.0, gap), args.max_gap)
+                time.sleep(max(0.0, due - time.monotonic()))
+
+            def land(path=path, rec=rec):
+                def landed():
+                    rec.t_land = time.monotonic()
+
+                _write_file(
+                    path,
+                    watch_dir / path.name,
+                    partial=rec.partial,
+                    partial_delay=args.partial_delay_ms / 1000.0,
+                    landed=landed,
+                )
+
+            if rec.partial:
+                # a slow writer should not hold up the schedule for later files
+                w = threading.Thread(target=land, daemon=True)
+                w.start()
+                writers.append(w)
+            else:
+                land()
+        for w in writers:
+            w.join()
+        t_end = time.monotonic()
+
+        deadline = t_end + args.timeout
+        while tracker.outstanding(api=bool(args.api)) and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        stop.set()
+        for t in pollers:
+            t.join()
+        if watcher is not None:
+            watcher.terminate()
+            try:
+                watcher.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                watcher.kill()
+
+    # superseded files of the final day must also be in the published series,
+    # otherwise the watcher never ingested them
+    try:
+        import pandas as pd
+
+        if _mtime(series_path) == series_m0:
+            series_ts = set()  # not rewritten during the run
+        else:
+            series_ts = {str(x) for x in pd.read_parquet(series_path, columns=["ts"])["ts"]}
+    except (OSError, ValueError, KeyError):
+        series_ts = None
+    last_day = records[-1].date
+    for r in records:
+        missing = series_ts is not None and r.date == last_day and r.ts not in series_ts
+        if r.status == "pending" or (r.status == "superseded" and missing):
+            r.status = "dropped"
+
+    plan_lat = [x for x in (r.latency_ms("t_plan") for r in records) if x is not None]
+    series_lat = [x for x in (r.latency_ms("t_series") for r in records) if x is not None]
+    api_lat = [x for x in (r.latency_ms("t_api") for r in records) if x is not None]
+    replay_s = max(1e-9, t_end - t0)
+    # output throughput runs until the last plan/series write, not the last landed file
+    t_out = max((t for r in records for t in (r.t_plan, r.t_series) if t is not None), default=t_end)
+    output_s = max(1e-9, t_out - t0)
+    published = sum(1 for r in records if r.status == "published")
+
+    report = {
+        "source": str(source),
+        "watch_dir": str(watch_dir),
+        "speed": args.speed,
+        "burst": args.burst,
+        "partial_prob": args.partial_prob,
+        "poll_ms": args.poll_ms,
+        "late_ms": args.late_ms,
+        "counts": {
+            "files": len(records),
+            "partial": sum(1 for r in records if r.partial),
+            "published": published,
+            "superseded": sum(1 for r in records if r.status == "superseded"),
+            "dropped": sum(1 for r in records if r.status == "dropped"),
+            "late": sum(1 for x in plan_lat if x > args.late_ms),
+        },
+        "throughput": {
+            "replay_seconds": replay_s,
+            "files_per_sec": len(records) / replay_s,
+            "output_seconds": output_s,
+            "drain_seconds": max(0.0, t_out - t_end),
+            "published_per_sec": published / output_s,
+        },
+        "latency": {
+            "land_to_plan": _latency_stats(plan_lat),
+            "land_to_series": _latency_stats(series_lat),
+            "land_to_api": _latency_stats(api_lat),
+        },
+        "files": [
+            {
+                **{k: v for k, v in asdict(r).items() if not k.startswith("t_")},
+                "land_to_plan_ms": r.latency_ms("t_plan"),
+                "land_to_series_ms": r.latency_ms("t_series"),
+                "land_to_api_ms": r.latency_ms("t_api"),
+            }
+            for r in records
+        ],
+    }
+
+    Path(args.report).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    _print_summary(report)
+    print(f"wrote report -> {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,16 +2,13 @@ from __future__ import annotations
 
 import argparse
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import pandas as pd
-import yaml
-from sklearn.compose import ColumnTransformer
-from sklearn.impute import SimpleImputer
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import accuracy_score, roc_auc_score
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler
-import joblib
+from gamma_trader import metrics, profiling
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from sklearn.pipeline import Pipeline
 
 
 FEATURES = [
@@ -30,16 +27,18 @@ FEATURES = [
 ]
 
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--config", required=True)
-    ap.add_argument("--data", default="data/dataset.parquet")
-    ap.add_argument("--model-out", default="data/model.joblib")
-    args = ap.parse_args()
+def fit_model(df: pd.DataFrame, cfg: dict) -> tuple[Pipeline, dict]:
+    """Fit the baseline classifier on all but the last test_days days.
 
-    cfg = yaml.safe_load(Path(args.config).read_text())
+    Returns the fitted pipeline and a dict of hold-out metrics.
+    """
+    from sklearn.compose import ColumnTransformer
+    from sklearn.impute import SimpleImputer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import accuracy_score, roc_auc_score
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
 
-    df = pd.read_parquet(args.data)
     df = df.dropna(subset=["y_dir"]).copy()
 
     # time split by last N days
@@ -61,20 +60,60 @@ def main():
 
     clf = LogisticRegression(max_iter=2000)
     pipe = Pipeline([("pre", pre), ("clf", clf)])
-    pipe.fit(X_train, y_train)
+    with metrics.timer("train.fit"):
+        pipe.fit(X_train, y_train)
+
+    acc = float("nan")
+    auc = float("nan")
+    if len(y_test):
+        with metrics.timer("inference.predict_proba"):
+            p = pipe.predict_proba(X_test)[:, 1]
+        y_hat = (p >= 0.5).astype(int)
+        acc = float(accuracy_score(y_test, y_hat))
+        auc = float(roc_auc_score(y_test, p)) if len(set(y_test)) > 1 else float("nan")
+
+    stats = {
+        "train_days": len(days[:cut]),
+        "test_days": len(days[cut:]),
+        "test_rows": len(test_set),
+        "acc": acc,
+        "auc": auc,
+    }
+    return pipe, stats
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--config", required=True)
+    ap.add_argument("--data", default="data/dataset.parquet")
+    ap.add_argument("--model-out", default="data/model.joblib")
+    ap.add_argument("--metrics", action="store_true", help="Print per-stage timings (or set GT_METRICS=1)")
+    profiling.add_profile_args(ap)
+    args = ap.parse_args()
+    if args.metrics:
+        metrics.enable()
+
+    with profiling.session("gt-train", args):
+        import joblib
+        import pandas as pd
+
+        from gamma_trader.ingest.config import load_config
 
-    p = pipe.predict_proba(X_test)[:, 1]
-    y_hat = (p >= 0.5).astype(int)
+        cfg = load_config(args.config)
 
-    acc = float(accuracy_score(y_test, y_hat)) if len(y_test) else float("nan")
-    auc = float(roc_auc_score(y_test, p)) if len(set(y_test)) > 1 else float("nan")
+        with metrics.timer("ingest.dataset"):
+            df = pd.read_parquet(args.data)
+        pipe, stats = fit_model(df, cfg)
 
-    Path(args.model_out).parent.mkdir(parents=True, exist_ok=True)
-    joblib.dump({"model": pipe, "features": FEATURES}, args.model_out)
+        Path(args.model_out).parent.mkdir(parents=True, exist_ok=True)
+        with metrics.timer("write.model"):
+            joblib.dump({"model": pipe, "features": FEATURES}, args.model_out)
 
-    print(f"train days: {len(days[:cut])} | test days: {len(days[cut:])}")
-    print(f"test rows: {len(test_set):,} | acc={acc:.4f} auc={auc:.4f}")
-    print(f"saved -> {args.model_out}")
+        print(f"train days: {stats['train_days']} | test days: {stats['test_days']}")
+        print(f"test rows: {stats['test_rows']:,} | acc={stats['acc']:.4f} auc={stats['auc']:.4f}")
+        print(f"saved -> {args.model_out}")
+        if metrics.enabled():
+            print(metrics.summary_table())
 
 
 if __name__ == "__main__":
@@ -7,11 +7,11 @@ from pathlib import Path
 
 import joblib
 import pandas as pd
-import yaml
 from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 
-from gamma_trader.features.levels import compute_levels_from_columnar_json
+from gamma_trader import metrics, profiling
+from gamma_trader.features.levels import compute_levels_from_columnar_json, to_eastern
 from gamma_trader.ingest.snapshot import load_snapshot_json, parse_snapshot_filename
 
 
@@ -32,7 +32,8 @@ def _write_plan_and_series(cfg: dict, *, df_today: pd.DataFrame, model_pack: dic
     model = model_pack["model"]
 
     g = df_today.sort_values("ts").copy()
-    g["p_up"] = model.predict_proba(g[feats])[:, 1]
+    with metrics.timer("inference.predict_proba"):
+        g["p_up"] = model.predict_proba(g[feats])[:, 1]
 
     last = g.iloc[-1]
     p_last = float(last["p_up"])
@@ -55,11 +56,13 @@ def _write_plan_and_series(cfg: dict, *, df_today: pd.DataFrame, model_pack: dic
         },
     }
 
-    out_plan.parent.mkdir(parents=True, exist_ok=True)
-    out_plan.write_text(json.dumps(plan, indent=2), encoding="utf-8")
+    with metrics.timer("write.plan"):
+        out_plan.parent.mkdir(parents=True, exist_ok=True)
+        out_plan.write_text(json.dumps(plan, indent=2), encoding="utf-8")
 
-    out_series.parent.mkdir(parents=True, exist_ok=True)
-    g.to_parquet(out_series, index=False)
+    with metrics.timer("write.series"):
+        out_series.parent.mkdir(parents=True, exist_ok=True)
+        g.to_parquet(out_series, index=False)
 
 
 class Handler(FileSystemEventHandler):
@@ -80,10 +83,22 @@ def main():
     ap.add_argument("--out-plan", default="data/latest_plan.json")
     ap.add_argument("--out-series", default="data/timeseries.parquet")
     ap.add_argument("--bootstrap", action="store_true", help="On start, load today's existing snapshots")
+    ap.add_argument(
+        "--metrics-out",
+        default="",
+        help="Prometheus text file refreshed after every snapshot (served by the API at /metrics), "
+        "e.g. data/metrics_watch.prom; off by default",
+    )
+    profiling.add_profile_args(ap, window=True)
     args = ap.parse_args()
 
-    cfg = yaml.safe_load(Path(args.config).read_text())
-    from gamma_trader.ingest.config import resolve_snapshot_dir
+    metrics_out = Path(args.metrics_out) if args.metrics_out else None
+    if metrics_out is not None:
+        metrics.enable()
+
+    from gamma_trader.ingest.config import load_config, resolve_snapshot_dir
+
+    cfg = load_config(args.config)
 
     snap_dir = resolve_snapshot_dir(cfg).expanduser()
 
@@ -96,15 +111,31 @@ def main():
     today_rows: list[dict] = []
     today_key: str | None = None
 
+    prof = profiling.from_args("gt-watch", args)
+
     def on_new(p: Path):
+        if prof is None or prof.finished:
+            ingest(p)
+            return
+        with prof:
+            if not ingest(p):
+                prof.skip()
+        if args.profile_files and prof.windows >= args.profile_files:
+            prof.finish()
+
+    def ingest(p: Path) -> bool:
+        """Update the plan/series from snapshot p; False if it was ignored or unreadable."""
         nonlocal today_key, today_rows
 
         if p.suffix.lower() != ".json":
-            return
+            return False
 
         meta = parse_snapshot_filename(p.name)
         if meta is None:
-            return
+            metrics.inc("watch.ignored_name")
+            return False
+
+        t_start = time.perf_counter()
 
         day = meta.observed_dt.date().isoformat()
         if today_key is None:
@@ -118,19 +149,28 @@ def main():
         js = None
         for _ in range(5):
             try:
-                js = load_snapshot_json(p)
+                with metrics.timer("ingest.parse"):
+                    js = load_snapshot_json(p)
                 break
             except Exception:
-                time.sleep(0.2)
+                metrics.inc("watch.read_retries")
+                with metrics.timer("ingest.wait"):
+                    time.sleep(0.2)
         if js is None:
             print(f"skip (unreadable): {p.name}")
-            return
-
-        lvl = compute_levels_from_columnar_json(
-            js,
-            band_pct=float(cfg.get("band_pct", 0.05)),
-            contract_multiplier=int(cfg.get("contract_multiplier", 100)),
-        )
+            metrics.inc("watch.skipped_unreadable")
+            if metrics_out is not None:
+                metrics.write_prometheus(metrics_out)
+            return False
+
+        with metrics.timer("features.levels"):
+            lvl = compute_levels_from_columnar_json(
+                js,
+                band_pct=float(cfg.get("band_pct", 0.05)),
+                contract_multiplier=int(cfg.get("contract_multiplier", 100)),
+                observed=to_eastern(meta.observed_dt, cfg.get("timezone")),
+                expiration=meta.expiration,
+            )
 
         row = {
             "ts": meta.observed_dt,
@@ -148,13 +188,21 @@ def main():
             "vega_net": lvl.vega_net,
             "vega_abs": lvl.vega_abs,
             "atm_iv_mid": lvl.atm_iv_mid,
+            "iv_upper": lvl.iv_upper,
+            "iv_lower": lvl.iv_lower,
+            "iv_move": lvl.iv_move,
         }
 
         today_rows.append(row)
         df_today = pd.DataFrame(today_rows).drop_duplicates(subset=["ts"]).sort_values("ts")
 
         _write_plan_and_series(cfg, df_today=df_today, model_pack=model_pack, out_plan=out_plan, out_series=out_series)
+        metrics.observe("watch.file_total", time.perf_counter() - t_start)
+        metrics.inc("watch.processed")
+        if metrics_out is not None:
+            metrics.write_prometheus(metrics_out)
         print(f"updated plan/series from: {p.name}")
+        return True
 
     # Bootstrap from existing snapshots for today (so restarts keep timeline)
     if args.bootstrap:
@@ -184,6 +232,10 @@ def main():
     finally:
         obs.stop()
         obs.join()
+        if prof is not None:
+            prof.finish()
+        if metrics.enabled():
+            print(metrics.summary_table())
 
 
 if __name__ == "__main__":
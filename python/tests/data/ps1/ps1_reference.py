@@ -0,0 +1,404 @@
+"""Row-by-row Python transliteration of the PS1 payload steps; it wrote `expected/`.
+
+Independent of gamma_trader on purpose: plain lists and dicts, one loop per PS1 loop,
+no numpy. Usage (from python/):
+
+    python tests/data/ps1/ps1_reference.py tests/data/ps1/snapshots tests/data/ps1/expected \
+        --tz America/Chicago
+
+Follows `ps/_ZeroDTE_Strategy_v8_1_2-SPX.ps1` run with -ObservedTimestampSource FileName,
+including its Get-Date quirk: `Get-Date -Hour .. -Minute .. -Second 0` keeps the current
+milliseconds, so slot bounds and third-Friday dates sit a fraction of a second (here
+437 ms) after the minute.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import re
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+INTERVAL = 15
+BAND_PCT = 0.05
+CONTRACT_MULTIPLIER = 100
+STRIKE_TOL = 0.01
+GET_DATE_MS = timedelta(milliseconds=437)
+ET = ZoneInfo("America/New_York")
+NAME = re.compile(
+    r"^(?P<ticker>[A-Z]+)-(?P<spot>\d+(\.\d+)?)-(?P<y>\d{4})-(?P<m>\d{2})-(?P<d>\d{2})"
+    r"-(?P<od>\d{8})-(?P<ot>\d{6})\.json$"
+)
+
+
+# --- Compute-LevelsFromFile -------------------------------------------------------
+
+
+def to_num(v):
+    """To-Num: null, blank or unparseable -> None."""
+    if v is None or (isinstance(v, str) and not v.strip()):
+        return None
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_side(s):
+    s = "" if s is None else str(s)
+    if not s.strip():
+        return None
+    s = s.strip().lower()
+    return {"c": "call", "calls": "call", "p": "put", "puts": "put"}.get(s, s)
+
+
+def column(js, key):
+    v = js.get(key)
+    return v if isinstance(v, list) else [v]
+
+
+def cell(values, i):
+    return values[i] if i < len(values) else None
+
+
+def chain_rows(js):
+    """One dict per optionSymbol, like the PS1's PSCustomObject rows."""
+    cols = {
+        k: column(js, k)
+        for k in ("strike", "side", "openInterest", "volume", "underlyingPrice", "gamma", "iv",
+                  "vega", "bid", "ask")
+    }
+    mid_key = next((k for k in ("mid", "midPrice", "mark") if js.get(k) is not None), None)
+    mids = column(js, mid_key) if mid_key else [None]
+    rows = []
+    for i in range(len(column(js, "optionSymbol"))):
+        mid = to_num(cell(mids, i))
+        if not (mid is not None and mid > 0):
+            bid, ask = to_num(cell(cols["bid"], i)), to_num(cell(cols["ask"], i))
+            both = bid is not None and ask is not None and bid > 0 and ask > 0
+            mid = (bid + ask) / 2.0 if both else None
+        rows.append(
+            {
+                "strike": to_num(cell(cols["strike"], i)),
+                "side": normalize_side(cell(cols["side"], i)),
+                "oi": to_num(cell(cols["openInterest"], i)),
+                "vol": to_num(cell(cols["volume"], i)),
+                "u": to_num(cell(cols["underlyingPrice"], i)),
+                "gamma": to_num(cell(cols["gamma"], i)),
+                "iv": to_num(cell(cols["iv"], i)),
+                "vega": to_num(cell(cols["vega"], i)),
+                "mid": mid,
+            }
+        )
+    return rows
+
+
+def average(xs):
+    total = 0.0
+    for x in xs:
+        total += x
+    return total / len(xs)
+
+
+def option_mid(rows, strike, side):
+    """Get-OptionMidAtStrike: mean mid at the strike, else the nearest strike with a mid."""
+    at = [
+        r["mid"]
+        for r in rows
+        if r["strike"] is not None and abs(r["strike"] - strike) <= STRIKE_TOL
+        and r["side"] == side and r["mid"] is not None and r["mid"] > 0
+    ]
+    if at:
+        return average(at)
+    cand = [
+        r
+        for r in rows
+        if r["strike"] is not None and r["side"] == side and r["mid"] is not None and r["mid"] > 0
+    ]
+    if not cand:
+        return None
+    return min(cand, key=lambda r: abs(r["strike"] - strike))["mid"]
+
+
+def directional_mid(rows, strike, spot):
+    """Get-DirectionalMidAtStrike: the call at or above spot, the put below."""
+    if strike is None or spot <= 0:
+        return None
+    return option_mid(rows, strike, "call" if strike >= spot else "put")
+
+
+def normalize_iv(iv):
+    if iv <= 0:
+        return None
+    if iv > 5:
+        iv = iv / 100.0
+    if iv < 0.0001:
+        return None
+    return min(iv, 5.0)
+
+
+def compute_levels(path, spot_in_name, observed_et, expiration):
+    rows = chain_rows(json.loads(Path(path).read_text(encoding="utf-8")))
+    spot = spot_in_name if spot_in_name and spot_in_name > 0 else rows[0]["u"]
+    lo, hi = spot * (1 - BAND_PCT), spot * (1 + BAND_PCT)
+    band = [r for r in rows if r["strike"] is not None and lo <= r["strike"] <= hi]
+
+    vega_net = vega_abs = 0.0
+    for r in band:
+        if r["vega"] is None or r["oi"] is None or r["vega"] == 0:
+            continue
+        contrib = r["vega"] * r["oi"] * CONTRACT_MULTIPLIER
+        vega_net += contrib * (-1.0 if r["side"] == "put" else 1.0)
+        vega_abs += abs(contrib)
+
+    call_vol = put_vol = 0.0
+    for r in band:
+        if r["vol"] is None:
+            continue
+        if r["side"] == "call":
+            call_vol += r["vol"]
+        elif r["side"] == "put":
+            put_vol += r["vol"]
+    pressure = None
+    if call_vol + put_vol > 0:
+        pressure = round((call_vol - put_vol) / (call_vol + put_vol) * 1e4) / 1e4
+
+    # Group-Object strike, sorted; NetGEX per strike
+    spot2 = spot * spot
+    groups = {}
+    for r in band:
+        groups.setdefault(r["strike"], []).append(r)
+    by_strike = []
+    for k in sorted(groups):
+        net = 0.0
+        for r in groups[k]:
+            if r["gamma"] is None or r["oi"] is None:
+                continue
+            sign = -1.0 if r["side"] == "put" else 1.0
+            net += r["gamma"] * r["oi"] * CONTRACT_MULTIPLIER * spot2 * sign
+        by_strike.append((k, net, abs(net)))
+
+    call_wall = put_wall = magnet = flip = None
+    call_wall_abs = put_wall_abs = magnet_abs = 0.0
+    if by_strike:
+        call_wall, _, call_wall_abs = max(by_strike, key=lambda b: b[1])
+        put_wall, _, put_wall_abs = min(by_strike, key=lambda b: b[1])
+        near = [b for b in by_strike if spot * 0.99 <= b[0] <= spot * 1.01]
+        if near:
+            magnet, _, magnet_abs = max(near, key=lambda b: b[2])
+        cum = 0.0
+        prev_cum = prev_strike = None
+        for k, net, _ in by_strike:
+            cum += net
+            if prev_cum is not None and ((prev_cum < 0 <= cum) or (prev_cum > 0 >= cum)):
+                flip = prev_strike if abs(prev_cum) <= abs(cum) else k
+                break
+            prev_cum, prev_strike = cum, k
+
+    mids = [directional_mid(rows, x, spot) for x in (call_wall, put_wall, magnet, flip)]
+
+    # ATM IV: strike nearest spot among rows with an IV (first one on ties, in file order)
+    with_iv = [r for r in rows if r["strike"] is not None and r["iv"] is not None and r["iv"] > 0]
+    iv_call = iv_put = iv_mid = None
+    if with_iv:
+        strikes = []
+        for r in with_iv:
+            if r["strike"] not in strikes:
+                strikes.append(r["strike"])
+        atm = min(strikes, key=lambda s: abs(s - spot))
+        calls = [r["iv"] for r in with_iv if r["strike"] == atm and r["side"] == "call"]
+        puts = [r["iv"] for r in with_iv if r["strike"] == atm and r["side"] == "put"]
+        if calls:
+            iv_call = normalize_iv(average(calls))
+        if puts:
+            iv_put = normalize_iv(average(puts))
+        if iv_call is not None and iv_put is not None:
+            iv_mid = (iv_call + iv_put) / 2
+        else:
+            iv_mid = iv_call if iv_call is not None else iv_put
+
+    iv_upper = iv_lower = None
+    if spot > 0 and iv_mid is not None and iv_mid > 0:
+        close = datetime(expiration.year, expiration.month, expiration.day, 16)
+        t_years = max(0.0, (close - observed_et).total_seconds()) / (365.0 * 24 * 3600)
+        move = spot * iv_mid * math.sqrt(max(0.0, t_years))
+        iv_upper, iv_lower = spot + move, spot - move
+
+    return {
+        "cw": call_wall, "pw": put_wall, "mg": magnet, "fl": flip, "pr": pressure,
+        "cwa": call_wall_abs, "pwa": put_wall_abs, "mga": magnet_abs,
+        "vn": vega_net, "va": vega_abs, "mids": mids,
+        "civ": iv_call, "piv": iv_put, "ivu": iv_upper, "ivl": iv_lower,
+    }
+
+
+# --- slots and segments -----------------------------------------------------------
+
+
+def rth_slots(d):
+    start = datetime(d.year, d.month, d.day, 9, 30) + GET_DATE_MS
+    end = datetime(d.year, d.month, d.day, 16) + GET_DATE_MS
+    out = []
+    cur, i = start, 0
+    while cur < end:
+        nxt = min(cur + timedelta(minutes=INTERVAL), end)
+        out.append((i, cur, nxt))
+        cur, i = nxt, i + 1
+    return out
+
+
+def third_friday(y, m):
+    first = datetime(y, m, 1) + GET_DATE_MS
+    return first + timedelta(days=(4 - first.weekday()) % 7 + 14)
+
+
+def weekly_expiration(d):
+    return d + timedelta(days=(4 - d.weekday()) % 7)
+
+
+def select_segments(root, local_tz):
+    """{"0"|"W"|"M": {"date|interval|slot": levels}}, earliest snapshot per slot."""
+    items = []
+    for f in Path(root).glob("*.json"):
+        m = NAME.match(f.name)
+        if not m:
+            continue
+        observed = datetime.strptime(m["od"] + m["ot"], "%Y%m%d%H%M%S")
+        expiration = date(int(m["y"]), int(m["m"]), int(m["d"]))
+        items.append((observed, f.name, f, float(m["spot"]), expiration))
+    items.sort(key=lambda x: (x[0], x[1]))  # Sort-Object observed, then name
+
+    seg = {"0": {}, "W": {}, "M": {}}
+    for observed, _, f, spot, expiration in items:
+        observed_et = observed.replace(tzinfo=local_tz).astimezone(ET).replace(tzinfo=None)
+        day = observed.date()
+        slot = next((i for i, s, e in rth_slots(observed_et.date()) if s <= observed_et < e), None)
+        if slot is None:
+            continue
+        key = f"{day.isoformat()}|{INTERVAL}|{slot}"
+
+        tf = third_friday(day.year, day.month)
+        if datetime(day.year, day.month, day.day) <= tf:
+            monthly = tf
+        else:
+            nxt = day.replace(day=1) + timedelta(days=32)
+            monthly = third_friday(nxt.year, nxt.month)
+        flags = (
+            (expiration == day, "0"),
+            (expiration == weekly_expiration(day), "W"),
+            (datetime(expiration.year, expiration.month, expiration.day) == monthly, "M"),
+        )
+        rec = None
+        for flag, kind in flags:
+            if flag and (key not in seg[kind] or observed < seg[kind][key]["observed"]):
+                if rec is None:
+                    rec = compute_levels(f, spot, observed_et, expiration)
+                    rec.update(observed=observed, date=day.isoformat(), slot=slot)
+                seg[kind][key] = rec
+    return seg
+
+
+# --- payload encoding -------------------------------------------------------------
+
+
+def _int32(v):
+    return v if -(2**31) <= v < 2**31 else 0
+
+
+def cents(x):
+    return 0 if x is None or x <= 0 else _int32(round(x * 100.0))
+
+
+def bp(x):
+    return 0 if x is None else _int32(round(x * 10000.0))
+
+
+def thousandths(x):
+    return 0 if x is None else _int32(round(x * 1000.0))
+
+
+def strength(cur, prev):
+    if cur <= 0:
+        return 0
+    if prev <= 0:
+        return 50
+    return round(min(100, max(0, 50 + 25 * math.log10(cur / prev))))
+
+
+def payload(segs, mode, max_chars, max_segments):
+    prev_c = prev_p = prev_m = 0.0
+    scored = []
+    for i, r, rm in segs:
+        sc = (strength(r["cwa"], prev_c), strength(r["pwa"], prev_p), strength(r["mga"], prev_m))
+        if r["cwa"] > 0:
+            prev_c = r["cwa"]
+        if r["pwa"] > 0:
+            prev_p = r["pwa"]
+        if r["mga"] > 0:
+            prev_m = r["mga"]
+        scored.append((i, r, rm, sc))
+
+    recs = []
+    for i, r, rm, sc in scored[-max_segments:]:
+        keys = ("cw", "pw", "mg", "fl")
+        base = [cents(r[k]) for k in keys]
+        monthly = [cents(rm[k]) for k in keys] if rm else [0, 0, 0, 0]
+        fields = [
+            r["date"].replace("-", ""), i if mode == "H" else 0, *base, bp(r["pr"]), *sc,
+            *base, *monthly, cents(r["ivu"]), cents(r["ivl"]), bp(r["civ"]), bp(r["piv"]),
+            thousandths(r["vn"]), thousandths(r["va"]), *[cents(x) for x in r["mids"]],
+        ]
+        recs.append(",".join(map(str, fields)))
+
+    header = f"8.1.2~{mode}~{INTERVAL}~"
+    text = header + "^".join(recs)
+    # over max_chars: drop the oldest records until it fits (or one is left)
+    while len(text) > max_chars and len(recs) > 1:
+        recs = recs[1:]
+        candidate = header + "^".join(recs)
+        if len(candidate) <= max_chars:
+            text = candidate
+    return text
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("snapshots")
+    ap.add_argument("out_dir")
+    ap.add_argument("--tz", required=True, help="Time zone of the times in the file names")
+    ap.add_argument("--max-chars", type=int, default=9000)
+    ap.add_argument("--max-segments", type=int, default=450)
+    ap.add_argument("--lookback-days", type=int, default=20)
+    args = ap.parse_args()
+
+    seg = select_segments(args.snapshots, ZoneInfo(args.tz))
+    days = {r["date"] for kind in ("0", "W") for r in seg[kind].values()}
+    out = Path(args.out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    for d in sorted(days)[-args.lookback_days :]:
+        day = date.fromisoformat(d)
+        for kind in ("0DTE", "WEEKLY"):
+            by_key = seg["0" if kind == "0DTE" else "W"]
+            for mode in ("H", "D"):
+                slots = [0] if mode == "D" else [i for i, _, _ in rth_slots(day)]
+                segs = [
+                    (i, by_key[k], seg["M"].get(k))
+                    for i in slots
+                    if (k := f"{d}|{INTERVAL}|{i}") in by_key
+                ]
+                if not segs:
+                    continue
+                text = payload(segs, mode, args.max_chars, args.max_segments)
+                if kind == "WEEKLY":
+                    exp = weekly_expiration(day)
+                    name = f"Payload_V8_1_2_SPX_{kind}_{day:%Y%m%d}_EXP{exp:%Y%m%d}_{mode}{INTERVAL}.txt"
+                else:
+                    name = f"Payload_V8_1_2_SPX_{kind}_{day:%Y%m%d}_{mode}{INTERVAL}.txt"
+                (out / name).write_text(text + "\n", encoding="utf-8", newline="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from gamma_trader.bench.suite import compare
+
+
+def _res(**results):
+    return {"meta": {}, "results": results}
+
+
+def _rows(base, new, **kw):
+    return {r["name"]: r for r in compare(base, new, **kw)}
+
+
+def test_threshold_is_exclusive():
+    base = _res(a={"median_s": 1.0}, b={"median_s": 1.0}, c={"median_s": 1.0})
+    new = _res(a={"median_s": 1.1}, b={"median_s": 1.11}, c={"median_s": 0.5})
+    rows = _rows(base, new, threshold=0.10)
+    assert not rows["a"]["regression"]
+    assert rows["b"]["regression"]
+    assert not rows["c"]["regression"]
+    assert rows["c"]["ratio"] == 0.5
+
+
+def test_custom_threshold_and_stat():
+    base = _res(a={"median_s": 1.0, "min_s": 1.0})
+    new = _res(a={"median_s": 1.0, "min_s": 1.3})
+    assert not _rows(base, new, threshold=0.5, stat="min_s")["a"]["regression"]
+    assert _rows(base, new, threshold=0.2, stat="min_s")["a"]["regression"]
+    assert not _rows(base, new, threshold=0.2)["a"]["regression"]
+
+
+def test_new_error_regresses_only_if_base_worked():
+    base = _res(a={"median_s": 1.0}, b={"error": "ValueError: x"})
+    new = _res(a={"error": "KeyError: 'y'"}, b={"error": "ValueError: x"})
+    rows = _rows(base, new)
+    assert rows["a"]["regression"] and rows["a"]["error"] == "KeyError: 'y'"
+    assert not rows["b"]["regression"]
+
+
+def test_missing_and_added_benchmarks():
+    base = _res(kept={"median_s": 1.0}, renamed={"median_s": 1.0})
+    new = _res(kept={"median_s": 1.0}, added={"median_s": 9.0})
+    rows = _rows(base, new)
+    assert rows["renamed"]["missing"] and rows["renamed"]["regression"]
+    assert not rows["added"]["missing"] and not rows["added"]["regression"]
+    assert not rows["kept"]["regression"]
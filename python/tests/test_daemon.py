@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import socket
+import threading
+import time
+
+import pytest
+
+from gamma_trader import daemon
+from gamma_trader.scripts import daemon as server
+
+
+@pytest.fixture
+def serve(tmp_path, monkeypatch):
+    """A daemon on a free port serving tmp_path/{config.yaml,dataset.parquet,model.joblib},
+    writing below tmp_path/out. Yields its address."""
+    tpath = tmp_path / "daemon.token"
+    monkeypatch.setenv("GT_DAEMON_TOKEN_FILE", str(tpath))
+    monkeypatch.setattr(server._Handler, "timeout", 0.2)
+    state = server._State(
+        config=str(tmp_path / "config.yaml"),
+        data=str(tmp_path / "dataset.parquet"),
+        model=str(tmp_path / "model.joblib"),
+        out_dir=str(tmp_path / "out"),
+        token=daemon.write_token(tpath),
+    )
+    monkeypatch.setattr(server, "STATE", state)
+    srv = server._Server(("127.0.0.1", 0), server._Handler)
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    yield f"127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_token_file_is_private(serve, tmp_path):
+    assert (tmp_path / "daemon.token").stat().st_mode & 0o777 == 0o600
+    assert "nothing loaded" in daemon.request("ping", addr=serve)["output"]
+
+
+def test_bad_token_is_refused(serve, tmp_path):
+    (tmp_path / "daemon.token").write_text("0" * 64, encoding="utf-8")
+    with pytest.raises(daemon.DaemonRefused, match="token"):
+        daemon.request("ping", addr=serve)
+
+
+def test_foreign_inputs_are_refused(serve, tmp_path):
+    out = str(tmp_path / "out" / "plan.md")
+    for kind in server.INPUTS:
+        with pytest.raises(daemon.DaemonRefused, match=f"--{kind}"):
+            daemon.request("plan", addr=serve, out=out, **{kind: str(tmp_path / "other")})
+
+
+@pytest.mark.parametrize("out", ["plan.md", "out/../plan.md", "out2/plan.md"])
+def test_outputs_outside_out_dir_are_refused(serve, tmp_path, out):
+    with pytest.raises(daemon.DaemonRefused, match="outside"):
+        daemon.request("plan", addr=serve, out=str(tmp_path / out))
+    assert not (tmp_path / out).exists()
+
+
+def test_forward_falls_back_when_refused_or_down(serve, tmp_path, capsys):
+    assert not daemon.forward("plan", addr=serve, out=str(tmp_path / "plan.md"))
+    assert "running locally" in capsys.readouterr().err
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        free = f"127.0.0.1:{s.getsockname()[1]}"
+    assert not daemon.forward("ping", addr=free)
+    assert "not reachable" in capsys.readouterr().err
+
+
+def test_silent_client_does_not_block_others(serve):
+    host, port = daemon.daemon_address(serve)
+    with socket.create_connection((host, port)):
+        t = time.monotonic()
+        assert daemon.request("ping", addr=serve, timeout=5)["ok"]
+    assert time.monotonic() - t < 2
+
+
+def test_stuck_daemon_times_out(tmp_path, monkeypatch):
+    monkeypatch.setenv("GT_DAEMON_TOKEN_FILE", str(tmp_path / "t"))
+    daemon.write_token(tmp_path / "t")
+    with socket.socket() as s:  # accepts connections (backlog) but never answers
+        s.bind(("127.0.0.1", 0))
+        s.listen()
+        t = time.monotonic()
+        with pytest.raises(daemon.DaemonUnavailable, match="timed out"):
+            daemon.request("ping", addr=f"127.0.0.1:{s.getsockname()[1]}", timeout=0.3)
+    assert time.monotonic() - t < 2
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import math
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gamma_trader.bench.synthetic import synthetic_chain
+from gamma_trader.features.levels import compute_levels_from_columnar_json, compute_ps1_levels
+from gamma_trader.features.payload import to_bp, to_cents, to_k
+from gamma_trader.features.segments import select_segments, snapshot_index, strength_scores
+from gamma_trader.ingest.snapshot import iter_snapshot_files
+from gamma_trader.scripts.payloads import (
+    _day_segments,
+    build_payloads,
+    parse_only_date,
+    write_payloads,
+)
+
+DATA = Path(__file__).parent / "data" / "ps1"
+CFG = {"symbol": "SPX", "timezone": "America/Chicago", "interval_minutes": 15}
+
+
+def _files():
+    return list(iter_snapshot_files(DATA / "snapshots"))
+
+
+def _payloads(**kw):
+    return build_payloads(CFG, _files(), timestamp_source="filename", **kw)
+
+
+def test_matches_ps1_payload_files(tmp_path):
+    paths = write_payloads(_payloads(), tmp_path, symbol="SPX", interval=15, newline="\n")
+    expected = sorted(p.name for p in (DATA / "expected").iterdir())
+    assert sorted(p.name for p in paths) == expected
+    for p in paths:
+        assert p.read_bytes() == (DATA / "expected" / p.name).read_bytes(), p.name
+
+
+def test_same_time_tie_goes_to_the_first_name():
+    files = _files()
+    for order in (files, files[::-1]):
+        idx = snapshot_index(order, timestamp_source="filename", local_tz="America/Chicago")
+        seg = select_segments(idx)["0DTE"]
+        assert seg.loc[("2024-01-17", 2), "name"] == "SPX-4750.50-2024-01-17-20240117-090500.json"
+
+
+def test_boundary_stamps_belong_to_the_slot_ending_there():
+    idx = snapshot_index(_files(), timestamp_source="filename", local_tz="America/Chicago")
+    slots = dict(zip(idx["name"], idx["slot"]))
+    assert "SPX-4760.00-2024-01-17-20240117-083000.json" not in slots  # 09:30:00 ET
+    assert slots["SPX-4758.50-2024-01-17-20240117-084500.json"] == 0  # 09:45:00 ET
+    assert slots["SPX-4766.75-2024-01-17-20240117-150000.json"] == 25  # 16:00:00 ET
+
+
+
+def test_level_paths_share_the_gex_core():
+    js = synthetic_chain(contracts=40, seed=3)  # no null cells
+    band = {"observed": datetime(2024, 1, 17, 10), "expiration": date(2024, 1, 17)}
+    a = compute_levels_from_columnar_json(js, **band)
+    b = compute_ps1_levels(js, **band)
+    for k in ("call_wall", "put_wall", "magnet", "flip", "pressure", "atm_iv_mid"):
+        assert getattr(a, k) == getattr(b, k), k
+    assert a.iv_move == pytest.approx(a.spot * a.atm_iv_mid * math.sqrt(6 / (365 * 24)))
+    assert a.iv_upper == a.spot + a.iv_move
+    assert compute_levels_from_columnar_json(js).iv_move is None
+
+    # a null gamma poisons its strike on the dataset path and is skipped on the PS1 path
+    js["gamma"][js["strike"].index(b.call_wall)] = None
+    assert math.isnan(compute_levels_from_columnar_json(js).call_wall_abs_gex)
+    assert compute_ps1_levels(js).call_wall_abs_gex > 0
+
+def test_strength_rounds_half_to_even():
+    # 50 + 25*log10(sqrt(10)) is exactly 62.5, 50 - 12.5 exactly 37.5
+    assert strength_scores([1.0, math.sqrt(10), 1.0]).tolist() == [50, 62, 38]
+    assert strength_scores([0.0, 2.0, np.nan, 2.0]).tolist() == [0, 50, 0, 50]
+
+
+def test_int32_overflow_is_zero():
+    assert to_cents([21474836.47, 21474836.48, -1.0, np.nan]).tolist() == [2**31 - 1, 0, 0, 0]
+    assert to_bp([-214748.3648, -214748.3649, np.nan]).tolist() == [-(2**31), 0, 0]
+    assert to_k([2147483.647, 2147483.648, 1e300]).tolist() == [2**31 - 1, 0, 0]
+    assert to_cents([0.125, 0.135]).tolist() == [12, 14]
+
+
+def test_daily_mode_uses_slot_zero():
+    for hourly in (True, False):
+        out = _payloads(modes=("D",), hourly=hourly, kinds=("0DTE",))
+        assert [(d, m) for d, _, m, _ in out] == [("2024-01-17", "D"), ("2024-01-22", "D")]
+        for day, _, _, text in out:
+            records = text.split("~", 3)[3].split("^")
+            assert len(records) == 1
+            assert records[0].startswith(day.replace("-", "") + ",0,")
+
+
+def test_daily_mode_without_a_first_slot_is_empty():
+    seg = pd.DataFrame(
+        {"path": ["a", "b"]},
+        index=pd.MultiIndex.from_tuples([("2024-01-17", 3), ("2024-01-17", 7)], names=["date", "slot"]),
+    )
+    assert _day_segments(seg, "2024-01-17", "D", True).empty
+    assert _day_segments(seg, "2024-01-17", "H", True).index.tolist() == [3, 7]
+    assert _day_segments(seg, "2024-01-18", "H", True).empty
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_one_trailing_newline_no_bom(tmp_path, newline):
+    (p,) = write_payloads(
+        [("2024-01-17", "0DTE", "D", "8.1.2~D~15~x")], tmp_path, symbol="SPX", interval=15, newline=newline
+    )
+    assert p.read_bytes() == b"8.1.2~D~15~x" + newline.encode()
+
+
+def test_only_date():
+    assert parse_only_date(" 20240117 ") == "2024-01-17"
+    assert parse_only_date("2024-01-17") == "2024-01-17"
+    assert parse_only_date("") == ""
+    for bad in ("2024/01/17", "17-01-2024", "20241317", "2024117", "yesterday"):
+        with pytest.raises(ValueError):
+            parse_only_date(bad)
+    assert [d for d, *_ in _payloads(only_date="2024-01-22", modes=("D",))] == ["2024-01-22"] * 2